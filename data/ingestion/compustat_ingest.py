@@ -19,8 +19,8 @@ def main():
     parser.add_argument("--output", default="data/samples/compustat_fundamentals.parquet")
     args = parser.parse_args()
 
-    provider = CompustatProvider()
-    df = provider.fetch_fundamentals(args.tickers)
+    with CompustatProvider() as provider:
+        df = provider.fetch_fundamentals(args.tickers)
     out_path = Path(args.output)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_parquet(out_path, index=False)
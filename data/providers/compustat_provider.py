@@ -3,14 +3,27 @@ from __future__ import annotations
 
 import os
 import sys
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover – stdlib decoding via requests
+    orjson = None
 
 from data.providers import BaseProvider
 
 BASE_URL = "https://api.compustat.com/v1/fundamentals"  # hypothetical
+POOL_SIZE = 16  # keep-alive connections held open to the API host
+MAX_CONCURRENCY = 8  # in-flight requests; stays under the vendor rate limit
+CACHE_TTL = 300.0  # seconds a response is reused before revalidating
+MAX_RETRIES = 3  # retries of connection errors and gateway failures per request
 
 
 class CompustatProvider(BaseProvider):
@@ -19,16 +32,61 @@ class CompustatProvider(BaseProvider):
         if not self.api_key:
             raise RuntimeError("COMPUSTAT_API_KEY not set for CompustatProvider")
         self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        # One pooled session so consecutive tickers reuse the TCP/TLS connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Transient gateway errors are retried on the pooled connection with
+        # backoff; the last response still reaches raise_for_status
+        retries = Retry(total=MAX_RETRIES, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                        raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # ticker -> (fetched_at monotonic, ETag, decoded payload)
+        self._cache: Dict[str, Tuple[float, Optional[str], Any]] = {}
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "CompustatProvider":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _fetch_payload(self, ticker: str) -> Any:
+        """Decoded response for ticker, served from cache or revalidated by ETag"""
+        now = time.monotonic()
+        cached = self._cache.get(ticker)
+        if cached is not None and now - cached[0] < CACHE_TTL:
+            return cached[2]
+
+        headers = {"If-None-Match": cached[1]} if cached is not None and cached[1] else None
+        resp = self.session.get(f"{BASE_URL}/{ticker}", headers=headers, timeout=30)
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 304 and cached is not None:
+            # Unchanged upstream: no body was sent, keep the cached payload
+            data, etag = cached[2], etag or cached[1]
+        else:
+            resp.raise_for_status()
+            data = orjson.loads(resp.content) if orjson is not None else resp.json()
+        self._cache[ticker] = (now, etag, data)
+        return data
+
+    def _fetch_one(self, ticker: str) -> Optional[pd.DataFrame]:
+        try:
+            return pd.json_normalize(self._fetch_payload(ticker))
+        except Exception as e:
+            print(f"Error fetching {ticker}: {e}", file=sys.stderr)
+            return None
 
-    def fetch_fundamentals(self, tickers: List[str]) -> pd.DataFrame:
-        dfs = []
-        for t in tickers:
-            url = f"{BASE_URL}/{t}"
-            try:
-                resp = requests.get(url, headers=self.headers, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-                dfs.append(pd.json_normalize(data))
-            except Exception as e:
-                print(f"Error fetching {t}: {e}", file=sys.stderr)
-        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
\ No newline at end of file
+    def fetch_fundamentals(self, tickers: List[str], max_concurrency: int = MAX_CONCURRENCY) -> pd.DataFrame:
+        if not tickers:
+            return pd.DataFrame()
+        # Requests are network-bound, so threads overlap the round-trips;
+        # map keeps the rows in ticker order. Workers beyond the pool size
+        # would open throwaway connections, so they are capped at it
+        workers = min(max_concurrency, POOL_SIZE, len(tickers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            dfs = [df for df in executor.map(self._fetch_one, tickers) if df is not None]
+        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
@@ -0,0 +1,31 @@
+"""Add accounts (user_id, account_type) index
+
+Revision ID: 9b1e4c7a2f30
+Revises: 583c6e86a6fd
+Create Date: 2026-10-17 10:12:04.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1e4c7a2f30'
+down_revision: Union[str, None] = '583c6e86a6fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Holdings are already covered by uq_holdings_account_symbol (account_id leads)
+    op.create_index(
+        "ix_accounts_user_id_account_type",
+        "accounts",
+        ["user_id", "account_type"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_accounts_user_id_account_type", table_name="accounts")
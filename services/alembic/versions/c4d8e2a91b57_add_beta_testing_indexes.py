@@ -0,0 +1,52 @@
+"""Add beta testing query indexes
+
+Revision ID: c4d8e2a91b57
+Revises: 9b1e4c7a2f30
+Create Date: 2026-10-17 14:36:51.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2a91b57'
+down_revision: Union[str, None] = '9b1e4c7a2f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The beta tables are created by Base.metadata.create_all rather than by a
+# migration (which also creates these indexes on fresh databases), so only
+# touch tables that exist and indexes that are missing or present.
+INDEXES = [
+    ("ix_beta_users_sessions_time", "beta_users", [sa.text("total_sessions DESC"), sa.text("total_session_time DESC")]),
+    ("ix_beta_users_phase_status", "beta_users", ["phase", "status"]),
+    ("ix_beta_feedback_type_status", "beta_feedback", ["feedback_type", "status"]),
+    ("ix_beta_sessions_user_duration", "beta_test_sessions", ["beta_user_id", "duration"]),
+]
+
+
+def _existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    return {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for _, table, _ in INDEXES if table in tables
+    }
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    for name, table, columns in INDEXES:
+        if table in existing and name not in existing[table]:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    for name, table, _ in reversed(INDEXES):
+        if name in existing.get(table, ()):
+            op.drop_index(name, table_name=table)
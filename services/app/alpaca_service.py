@@ -1,9 +1,13 @@
 """Alpaca trading and account management service"""
 import os
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Any, Tuple, TypedDict
 from urllib.parse import urlencode
 from fastapi import HTTPException, status
+from requests.adapters import HTTPAdapter
 from alpaca_trade_api import REST, TimeFrame
 from alpaca_trade_api.rest import APIError
 from datetime import datetime, timedelta
@@ -13,11 +17,125 @@ import alpaca_trade_api as tradeapi
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Positions only change on fills, so dashboards polling every tick can share
+# one upstream call for this many seconds.
+POSITIONS_CACHE_TTL = 2.0
+
+# Keep-alive connections held open to the Alpaca REST endpoint. Sized above
+# the default of 10 because the async order routes run broker calls in
+# worker threads via asyncio.to_thread; concurrent ones then reuse warm TLS
+# connections instead of paying a fresh handshake per order.
+ALPACA_HTTP_POOL_SIZE = 32
+
+
+@dataclass(frozen=True)
+class AlpacaSettings:
+    """Alpaca credentials and endpoint, read once from the environment"""
+    api_key: Optional[str] = None
+    api_secret: Optional[str] = None
+    base_url: str = "https://paper-api.alpaca.markets"
+
+    @classmethod
+    def from_env(cls) -> "AlpacaSettings":
+        return cls(
+            api_key=os.getenv("ALPACA_API_KEY"),
+            api_secret=os.getenv("ALPACA_API_SECRET"),
+            base_url=os.getenv("ALPACA_BASE_URL", cls.base_url),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_alpaca_settings() -> AlpacaSettings:
+    """Return process-wide Alpaca settings (call ``cache_clear()`` to reload)"""
+    return AlpacaSettings.from_env()
+
+
+class OrderDict(TypedDict, total=False):
+    """Shape of the order payloads returned by AlpacaService"""
+    id: str
+    client_order_id: Optional[str]
+    symbol: str
+    qty: Optional[float]
+    side: str
+    order_type: str
+    type: str
+    order_class: str
+    time_in_force: str
+    limit_price: Optional[float]
+    stop_price: Optional[float]
+    trail_percent: Optional[float]
+    trail_price: Optional[float]
+    notional: Optional[float]
+    status: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    submitted_at: Optional[str]
+    filled_at: Optional[str]
+    expired_at: Optional[str]
+    canceled_at: Optional[str]
+    failed_at: Optional[str]
+    replaced_at: Optional[str]
+    replaced_by: Optional[str]
+    replaces: Optional[str]
+    asset_id: str
+    asset_class: str
+    filled_qty: Optional[float]
+    filled_avg_price: Optional[float]
+    amount: Optional[float]
+    hwm: Optional[float]
+    commission: Optional[float]
+    extended_hours: bool
+
+
+# Order serialization tables: (passthrough fields, float fields, timestamp fields)
+_OrderFields = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+_ORDER_FIELDS: _OrderFields = (
+    ("id", "client_order_id", "symbol", "side", "order_type", "time_in_force",
+     "status", "extended_hours"),
+    ("qty", "limit_price", "stop_price", "filled_qty", "filled_avg_price", "commission"),
+    ("created_at", "updated_at", "submitted_at", "filled_at"),
+)
+
+_ORDER_DETAIL_FIELDS: _OrderFields = (
+    _ORDER_FIELDS[0] + ("replaced_by", "replaces", "asset_id", "asset_class",
+                        "order_class", "type"),
+    _ORDER_FIELDS[1] + ("trail_percent", "trail_price", "notional", "amount", "hwm"),
+    _ORDER_FIELDS[2] + ("expired_at", "canceled_at", "failed_at", "replaced_at"),
+)
+
+
+def _order_to_dict(order: Any, fields: _OrderFields = _ORDER_FIELDS) -> OrderDict:
+    """Convert an Alpaca order entity into a plain dict using a field table"""
+    passthrough, floats, timestamps = fields
+    result = {name: getattr(order, name) for name in passthrough}
+    for name in floats:
+        value = getattr(order, name)
+        result[name] = float(value) if value else None
+    for name in timestamps:
+        value = getattr(order, name)
+        result[name] = value.isoformat() if value else None
+    return result  # type: ignore[return-value]
+
+
+def _configure_connection_pool(api: Any, pool_size: int = ALPACA_HTTP_POOL_SIZE) -> None:
+    """Widen the SDK's keep-alive session pool, if it exposes one"""
+    session = getattr(api, "_session", None)
+    if session is None or not hasattr(session, "mount"):
+        return
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
 class AlpacaService:
-    def __init__(self):
-        self.api_key = os.getenv("ALPACA_API_KEY")
-        self.api_secret = os.getenv("ALPACA_API_SECRET")
-        self.base_url = os.getenv("ALPACA_BASE_URL", "https://paper-api.alpaca.markets")
+    def __init__(self, settings: Optional[AlpacaSettings] = None):
+        settings = settings or get_alpaca_settings()
+        self.api_key = settings.api_key
+        self.api_secret = settings.api_secret
+        self.base_url = settings.base_url
+        self._positions_cache: Optional[Tuple[float, List[Dict]]] = None
+        self._positions_ttl = POSITIONS_CACHE_TTL
         
         if not self.api_key or not self.api_secret:
             logger.warning("Alpaca API credentials not found in environment variables")
@@ -29,6 +147,7 @@ class AlpacaService:
                     secret_key=self.api_secret,
                     base_url=self.base_url
                 )
+                _configure_connection_pool(self.api)
                 logger.info("Alpaca API client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Alpaca API client: {e}")
@@ -84,13 +203,20 @@ class AlpacaService:
             logger.error(f"Error getting account: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get account")
     
+    def invalidate_positions(self) -> None:
+        """Drop cached positions so the next read goes upstream"""
+        self._positions_cache = None
+
     def get_positions(self) -> List[Dict]:
-        """Get current positions"""
+        """Get current positions (cached for a short TTL)"""
         if not self.api:
             return []
+        cached = self._positions_cache
+        if cached is not None and time.monotonic() - cached[0] < self._positions_ttl:
+            return list(cached[1])
         try:
             positions = self.api.list_positions()
-            return [
+            result = [
                 {
                     "symbol": pos.symbol,
                     "quantity": float(pos.qty),
@@ -109,6 +235,8 @@ class AlpacaService:
                 }
                 for pos in positions
             ]
+            self._positions_cache = (time.monotonic(), result)
+            return list(result)
         except APIError as e:
             logger.error(f"Alpaca API error getting positions: {e}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -120,7 +248,7 @@ class AlpacaService:
                      time_in_force: str = "day", limit_price: Optional[float] = None,
                      stop_price: Optional[float] = None, trail_percent: Optional[float] = None,
                      trail_price: Optional[float] = None, extended_hours: bool = False,
-                     client_order_id: Optional[str] = None) -> Dict:
+                     client_order_id: Optional[str] = None) -> OrderDict:
         """Submit an order to Alpaca"""
         if not self.api:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Alpaca API not available")
@@ -139,45 +267,9 @@ class AlpacaService:
                 extended_hours=extended_hours,
                 client_order_id=client_order_id
             )
+            self.invalidate_positions()
             
-            return {
-                "id": order.id,
-                "client_order_id": order.client_order_id,
-                "symbol": order.symbol,
-                "qty": float(order.qty),
-                "side": order.side,
-                "order_type": order.order_type,
-                "time_in_force": order.time_in_force,
-                "limit_price": float(order.limit_price) if order.limit_price else None,
-                "stop_price": float(order.stop_price) if order.stop_price else None,
-                "trail_percent": float(order.trail_percent) if order.trail_percent else None,
-                "trail_price": float(order.trail_price) if order.trail_price else None,
-                "status": order.status,
-                "created_at": order.created_at.isoformat() if order.created_at else None,
-                "updated_at": order.updated_at.isoformat() if order.updated_at else None,
-                "submitted_at": order.submitted_at.isoformat() if order.submitted_at else None,
-                "filled_at": order.filled_at.isoformat() if order.filled_at else None,
-                "expired_at": order.expired_at.isoformat() if order.expired_at else None,
-                "canceled_at": order.canceled_at.isoformat() if order.canceled_at else None,
-                "failed_at": order.failed_at.isoformat() if order.failed_at else None,
-                "replaced_at": order.replaced_at.isoformat() if order.replaced_at else None,
-                "replaced_by": order.replaced_by,
-                "replaces": order.replaces,
-                "asset_id": order.asset_id,
-                "asset_class": order.asset_class,
-                "notional": float(order.notional) if order.notional else None,
-                "qty": float(order.qty) if order.qty else None,
-                "filled_qty": float(order.filled_qty) if order.filled_qty else None,
-                "filled_avg_price": float(order.filled_avg_price) if order.filled_avg_price else None,
-                "order_class": order.order_class,
-                "order_type": order.order_type,
-                "type": order.type,
-                "side": order.side,
-                "amount": float(order.amount) if order.amount else None,
-                "hwm": float(order.hwm) if order.hwm else None,
-                "commission": float(order.commission) if order.commission else None,
-                "extended_hours": order.extended_hours,
-            }
+            return _order_to_dict(order, _ORDER_DETAIL_FIELDS)
         except APIError as e:
             logger.error(f"Alpaca API error submitting order: {e}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -185,32 +277,13 @@ class AlpacaService:
             logger.error(f"Error submitting order: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to submit order")
     
-    def get_order(self, order_id: str) -> Optional[Dict]:
+    def get_order(self, order_id: str) -> Optional[OrderDict]:
         """Get order by ID"""
         if not self.api:
             return None
         try:
             order = self.api.get_order(order_id)
-            return {
-                "id": order.id,
-                "client_order_id": order.client_order_id,
-                "symbol": order.symbol,
-                "qty": float(order.qty) if order.qty else None,
-                "side": order.side,
-                "order_type": order.order_type,
-                "time_in_force": order.time_in_force,
-                "limit_price": float(order.limit_price) if order.limit_price else None,
-                "stop_price": float(order.stop_price) if order.stop_price else None,
-                "status": order.status,
-                "created_at": order.created_at.isoformat() if order.created_at else None,
-                "updated_at": order.updated_at.isoformat() if order.updated_at else None,
-                "submitted_at": order.submitted_at.isoformat() if order.submitted_at else None,
-                "filled_at": order.filled_at.isoformat() if order.filled_at else None,
-                "filled_qty": float(order.filled_qty) if order.filled_qty else None,
-                "filled_avg_price": float(order.filled_avg_price) if order.filled_avg_price else None,
-                "commission": float(order.commission) if order.commission else None,
-                "extended_hours": order.extended_hours,
-            }
+            return _order_to_dict(order, _ORDER_FIELDS)
         except APIError as e:
             logger.error(f"Alpaca API error getting order: {e}")
             return None
@@ -224,6 +297,7 @@ class AlpacaService:
             return False
         try:
             self.api.cancel_order(order_id)
+            self.invalidate_positions()
             return True
         except APIError as e:
             logger.error(f"Alpaca API error canceling order: {e}")
@@ -232,12 +306,12 @@ class AlpacaService:
             logger.error(f"Error canceling order: {e}")
             return False
     
-    def get_orders(self, status: Optional[str] = None, limit: int = 100, 
-                   after: Optional[datetime] = None, until: Optional[datetime] = None,
-                   direction: str = "desc", nested: bool = True) -> List[Dict]:
-        """Get orders"""
+    def iter_orders(self, status: Optional[str] = None, limit: int = 100,
+                    after: Optional[datetime] = None, until: Optional[datetime] = None,
+                    direction: str = "desc", nested: bool = True) -> Iterator[OrderDict]:
+        """Yield orders one at a time, converting each lazily"""
         if not self.api:
-            return []
+            return
         try:
             orders = self.api.list_orders(
                 status=status,
@@ -247,40 +321,35 @@ class AlpacaService:
                 direction=direction,
                 nested=nested
             )
-            return [
-                {
-                    "id": order.id,
-                    "client_order_id": order.client_order_id,
-                    "symbol": order.symbol,
-                    "qty": float(order.qty) if order.qty else None,
-                    "side": order.side,
-                    "order_type": order.order_type,
-                    "time_in_force": order.time_in_force,
-                    "limit_price": float(order.limit_price) if order.limit_price else None,
-                    "stop_price": float(order.stop_price) if order.stop_price else None,
-                    "status": order.status,
-                    "created_at": order.created_at.isoformat() if order.created_at else None,
-                    "updated_at": order.updated_at.isoformat() if order.updated_at else None,
-                    "submitted_at": order.submitted_at.isoformat() if order.submitted_at else None,
-                    "filled_at": order.filled_at.isoformat() if order.filled_at else None,
-                    "filled_qty": float(order.filled_qty) if order.filled_qty else None,
-                    "filled_avg_price": float(order.filled_avg_price) if order.filled_avg_price else None,
-                    "commission": float(order.commission) if order.commission else None,
-                    "extended_hours": order.extended_hours,
-                }
-                for order in orders
-            ]
         except APIError as e:
             logger.error(f"Alpaca API error getting orders: {e}")
-            return []
+            return
         except Exception as e:
             logger.error(f"Error getting orders: {e}")
-            return []
+            return
+        for order in orders:
+            yield _order_to_dict(order, _ORDER_FIELDS)
+
+    def get_orders(self, status: Optional[str] = None, limit: int = 100,
+                   after: Optional[datetime] = None, until: Optional[datetime] = None,
+                   direction: str = "desc", nested: bool = True) -> List[OrderDict]:
+        """Get orders (errors are logged by iter_orders and yield an empty list)"""
+        return list(self.iter_orders(
+            status=status,
+            limit=limit,
+            after=after,
+            until=until,
+            direction=direction,
+            nested=nested
+        ))
 
 def execute_trade(symbol: str, quantity: float, action: str):
     """Legacy function for backward compatibility"""
-    service = AlpacaService()
-    if not service.is_connected():
+    # Imported lazily: the integrations package imports this module
+    from .integrations import get_alpaca_service
+
+    service = get_alpaca_service()
+    if not getattr(service, "api", None):
         logger.warning("Alpaca not connected, simulating trade")
         return {"symbol": symbol, "quantity": quantity, "action": action, "status": "simulated"}
     
@@ -295,4 +364,3 @@ def execute_trade(symbol: str, quantity: float, action: str):
     except Exception as e:
         logger.error(f"Failed to execute trade: {e}")
         return {"symbol": symbol, "quantity": quantity, "action": action, "status": "failed", "error": str(e)}
-
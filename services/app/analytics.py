@@ -1,12 +1,49 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from .database import Account, Holding, Transaction, TransactionType
-import yfinance as yf
+from .price_cache import get_close_prices
 from dataclasses import dataclass
 
+try:
+    from numba import njit  # type: ignore
+except ImportError:  # pragma: no cover – numba is optional
+    njit = None
+
+BENCHMARK_SYMBOL = "SPY"
+INVESTMENT_ACCOUNT_TYPES = ['investment', 'retirement']
+
+
+def _max_drawdown_numpy(returns: np.ndarray) -> float:
+    """Maximum drawdown of a daily return series (vectorized)"""
+    cumulative_returns = (1.0 + returns).cumprod()
+    rolling_max = np.maximum.accumulate(cumulative_returns)
+    return float(((cumulative_returns - rolling_max) / rolling_max).min())
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _max_drawdown(returns: np.ndarray) -> float:
+        """Maximum drawdown in a single fused pass (no temporaries)"""
+        cumulative = 1.0
+        # The first cumulative value seeds the peak, as in the NumPy path,
+        # so an opening loss is not counted as a drawdown
+        peak = -np.inf
+        max_drawdown = 0.0
+        for r in returns:
+            cumulative *= 1.0 + r
+            if cumulative > peak:
+                peak = cumulative
+            drawdown = (cumulative - peak) / peak
+            if drawdown < max_drawdown:
+                max_drawdown = drawdown
+        return max_drawdown
+else:
+    _max_drawdown = _max_drawdown_numpy
+
 
 @dataclass
 class PerformanceMetrics:
@@ -27,15 +64,14 @@ class PortfolioAnalytics:
     
     def __init__(self, db: Session):
         self.db = db
+        # user_id -> investment accounts with holdings eager-loaded
+        self._account_cache: Dict[int, List[Account]] = {}
     
     def calculate_portfolio_returns(self, user_id: int, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Calculate daily portfolio returns for a user"""
         
         # Get all investment accounts for the user
-        accounts = self.db.query(Account).filter(
-            Account.user_id == user_id,
-            Account.account_type.in_(['investment', 'retirement'])
-        ).all()
+        accounts = self._accounts_with_holdings(user_id)
         
         if not accounts:
             return pd.DataFrame()
@@ -70,16 +106,14 @@ class PortfolioAnalytics:
         # Get unique symbols
         symbols = transactions_df['symbol'].unique()
         
-        # Download historical price data
-        price_data = {}
-        for symbol in symbols:
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(start=start_date, end=end_date + timedelta(days=1))
-                price_data[symbol] = hist['Close']
-            except Exception as e:
-                print(f"Error fetching data for {symbol}: {e}")
-                continue
+        # Download historical price data for all symbols in one batch; the
+        # benchmark rides along so _calculate_benchmark_metrics hits the cache
+        try:
+            price_data = get_close_prices(list(symbols) + [BENCHMARK_SYMBOL], start_date, end_date)
+        except Exception as e:
+            print(f"Error fetching price data for {list(symbols)}: {e}")
+            price_data = {}
+        price_data = {symbol: price_data[symbol] for symbol in symbols if symbol in price_data}
         
         if not price_data:
             return pd.DataFrame()
@@ -87,45 +121,35 @@ class PortfolioAnalytics:
         # Create date range
         date_range = pd.date_range(start=start_date, end=end_date, freq='D')
         
-        # Calculate daily portfolio values
-        portfolio_values = []
-        
-        for date in date_range:
-            total_value = 0
-            
-            # Calculate cumulative positions up to this date
-            for symbol in symbols:
-                symbol_transactions = transactions_df[
-                    (transactions_df['symbol'] == symbol) & 
-                    (transactions_df['date'] <= date)
-                ]
-                
-                if symbol_transactions.empty or symbol not in price_data:
-                    continue
-                
-                # Calculate total shares held
-                total_shares = symbol_transactions['quantity'].sum()
-                
-                if total_shares > 0:
-                    # Get price for this date
-                    try:
-                        price = price_data[symbol].asof(date)
-                        if pd.notna(price):
-                            total_value += total_shares * price
-                    except (KeyError, IndexError):
-                        continue
-            
-            portfolio_values.append({
-                'date': date,
-                'portfolio_value': total_value
-            })
-        
-        df_portfolio = pd.DataFrame(portfolio_values)
-        
-        # Calculate daily returns
-        df_portfolio['daily_return'] = df_portfolio['portfolio_value'].pct_change()
-        
-        return df_portfolio
+        # Cumulative shares held per (transaction date, symbol), carried forward
+        # onto the daily grid so each day sees every transaction up to and
+        # including it
+        quantities = transactions_df.assign(
+            quantity=transactions_df['quantity'].astype(float)
+        ).pivot_table(index='date', columns='symbol', values='quantity', aggfunc='sum')
+        positions = quantities.fillna(0.0).cumsum().reindex(date_range, method='ffill')
+        
+        # Last known close on or before each day (equivalent to Series.asof)
+        prices = pd.DataFrame(price_data).sort_index().ffill().reindex(date_range, method='ffill')
+        positions = positions.reindex(columns=prices.columns).fillna(0.0)
+        
+        # Only long positions with a known price contribute to portfolio value
+        shares = np.clip(positions.to_numpy(dtype=float), 0.0, None)
+        closes = np.nan_to_num(prices.to_numpy(dtype=float), nan=0.0)
+        values = np.einsum('ij,ij->i', shares, closes)
+        
+        # Calculate daily returns (same semantics as Series.pct_change)
+        daily_returns = np.empty_like(values)
+        daily_returns[:1] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_returns[1:] = np.diff(values) / values[:-1]
+        
+        # Build the frame from columnar arrays in one shot
+        return pd.DataFrame({
+            'date': date_range.values,
+            'portfolio_value': values,
+            'daily_return': daily_returns
+        })
     
     def calculate_performance_metrics(self, user_id: int, period_days: int = 365) -> Optional[PerformanceMetrics]:
         """Calculate comprehensive performance metrics for a user's portfolio"""
@@ -163,10 +187,7 @@ class PortfolioAnalytics:
         sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
         
         # Maximum drawdown
-        cumulative_returns = (1 + returns).cumprod()
-        rolling_max = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - rolling_max) / rolling_max
-        max_drawdown = drawdown.min()
+        max_drawdown = float(_max_drawdown(np.ascontiguousarray(returns.to_numpy(dtype=np.float64))))
         
         # Benchmark comparison (S&P 500)
         benchmark_return, alpha, beta = self._calculate_benchmark_metrics(returns, start_date, end_date)
@@ -186,33 +207,38 @@ class PortfolioAnalytics:
     def _calculate_benchmark_metrics(self, portfolio_returns: pd.Series, start_date: datetime, end_date: datetime) -> Tuple[float, float, float]:
         """Calculate alpha and beta vs S&P 500"""
         
+        # Nothing to regress for inactive portfolios; skip the benchmark fetch
+        returns_array = portfolio_returns.to_numpy(dtype=np.float64)
+        if len(returns_array) < 2 or returns_array.std() == 0:
+            return 0.0, 0.0, 1.0
+        
         try:
             # Get S&P 500 data
-            spy = yf.Ticker("SPY")
-            spy_data = spy.history(start=start_date, end=end_date + timedelta(days=1))
-            spy_returns = spy_data['Close'].pct_change().dropna()
+            spy_close = get_close_prices([BENCHMARK_SYMBOL], start_date, end_date)[BENCHMARK_SYMBOL]
+            spy_returns = spy_close.pct_change().dropna()
             
-            # Align dates
-            portfolio_returns = portfolio_returns.reset_index(drop=True)
-            spy_returns = spy_returns.reset_index(drop=True)
+            # Align dates (positionally, on contiguous float64 arrays)
+            p = returns_array
+            s = spy_returns.to_numpy(dtype=np.float64)
+            min_length = min(len(p), len(s))
+            p, s = p[:min_length], s[:min_length]
             
-            min_length = min(len(portfolio_returns), len(spy_returns))
-            portfolio_returns = portfolio_returns.iloc[:min_length]
-            spy_returns = spy_returns.iloc[:min_length]
+            # Calculate benchmark return (compounded in log space for stability)
+            benchmark_return = float(np.expm1(np.log1p(s).sum()))
             
-            # Calculate benchmark return
-            benchmark_return = (1 + spy_returns).prod() - 1
+            # Means and the 2x2 covariance matrix in one pass each
+            returns_matrix = np.stack((p, s))
+            means = returns_matrix.mean(axis=1)
+            cov = np.cov(returns_matrix, ddof=0)
             
             # Calculate beta
-            covariance = np.cov(portfolio_returns, spy_returns)[0, 1]
-            benchmark_variance = np.var(spy_returns)
-            beta = covariance / benchmark_variance if benchmark_variance > 0 else 0
+            beta = float(cov[0, 1] / cov[1, 1]) if cov[1, 1] > 0 else 0.0
             
             # Calculate alpha (annualized)
-            portfolio_mean = portfolio_returns.mean() * 252
-            benchmark_mean = spy_returns.mean() * 252
+            portfolio_mean = means[0] * 252
+            benchmark_mean = means[1] * 252
             risk_free_rate = 0.02
-            alpha = portfolio_mean - risk_free_rate - beta * (benchmark_mean - risk_free_rate)
+            alpha = float(portfolio_mean - risk_free_rate - beta * (benchmark_mean - risk_free_rate))
             
             return benchmark_return, alpha, beta
             
@@ -220,44 +246,66 @@ class PortfolioAnalytics:
             print(f"Error calculating benchmark metrics: {e}")
             return 0.0, 0.0, 1.0
     
+    def _accounts_with_holdings(self, user_id: int) -> List[Account]:
+        """Load a user's investment accounts and their holdings once per instance"""
+        
+        accounts = self._account_cache.get(user_id)
+        if accounts is None:
+            accounts = self.db.query(Account).options(
+                selectinload(Account.holdings)
+            ).filter(
+                Account.user_id == user_id,
+                Account.account_type.in_(INVESTMENT_ACCOUNT_TYPES)
+            ).all()
+            self._account_cache[user_id] = accounts
+        return accounts
+    
+    def _investment_holdings(self, user_id: int) -> List[Holding]:
+        """Every holding across a user's investment accounts"""
+        
+        return [
+            holding
+            for account in self._accounts_with_holdings(user_id)
+            for holding in account.holdings
+        ]
+    
+    def _security_type_totals(self, user_id: int) -> Dict[str, float]:
+        """Market value per security type across a user's investment accounts"""
+        
+        if user_id in self._account_cache:
+            # Holdings already loaded for this instance; aggregate in memory
+            rows = [(h.security_type, h.market_value) for h in self._investment_holdings(user_id)]
+        else:
+            rows = self.db.query(
+                Holding.security_type, func.sum(Holding.market_value)
+            ).join(Account).filter(
+                Account.user_id == user_id,
+                Account.account_type.in_(INVESTMENT_ACCOUNT_TYPES)
+            ).group_by(Holding.security_type).all()
+        
+        totals: Dict[str, float] = {}
+        for security_type, market_value in rows:
+            key = security_type or 'unknown'
+            totals[key] = totals.get(key, 0.0) + float(market_value or 0)
+        return totals
+    
     def get_current_portfolio_value(self, user_id: int) -> float:
         """Get current total portfolio value for a user"""
         
-        # Get all investment accounts
-        accounts = self.db.query(Account).filter(
-            Account.user_id == user_id,
-            Account.account_type.in_(['investment', 'retirement'])
-        ).all()
-        
-        total_value = 0.0
+        if user_id in self._account_cache:
+            return sum((float(holding.market_value) for holding in self._investment_holdings(user_id)), 0.0)
         
-        for account in accounts:
-            # Get current holdings
-            holdings = self.db.query(Holding).filter(Holding.account_id == account.id).all()
-            
-            for holding in holdings:
-                total_value += holding.market_value
-        
-        return total_value
+        total_value = self.db.query(func.sum(Holding.market_value)).join(Account).filter(
+            Account.user_id == user_id,
+            Account.account_type.in_(INVESTMENT_ACCOUNT_TYPES)
+        ).scalar()
+        return float(total_value or 0)
     
     def get_asset_allocation(self, user_id: int) -> Dict[str, float]:
         """Get current asset allocation breakdown"""
         
-        accounts = self.db.query(Account).filter(
-            Account.user_id == user_id,
-            Account.account_type.in_(['investment', 'retirement'])
-        ).all()
-        
-        allocation = {}
-        total_value = 0.0
-        
-        for account in accounts:
-            holdings = self.db.query(Holding).filter(Holding.account_id == account.id).all()
-            
-            for holding in holdings:
-                security_type = holding.security_type or 'unknown'
-                allocation[security_type] = allocation.get(security_type, 0) + holding.market_value
-                total_value += holding.market_value
+        allocation = self._security_type_totals(user_id)
+        total_value = sum(allocation.values())
         
         # Convert to percentages
         if total_value > 0:
@@ -268,26 +316,20 @@ class PortfolioAnalytics:
     def get_performance_attribution(self, user_id: int, period_days: int = 30) -> Dict[str, float]:
         """Calculate performance attribution by security"""
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=period_days)
+        holdings = self._investment_holdings(user_id)
         
-        accounts = self.db.query(Account).filter(
-            Account.user_id == user_id,
-            Account.account_type.in_(['investment', 'retirement'])
-        ).all()
+        # Portfolio value is needed for every weight; compute it once
+        total_value = sum((float(holding.market_value) for holding in holdings), 0.0)
+        if total_value <= 0:
+            return {}
         
-        attribution = {}
+        attributed = [h for h in holdings if h.symbol and h.cost_basis]
+        if not attributed:
+            return {}
         
-        for account in accounts:
-            holdings = self.db.query(Holding).filter(Holding.account_id == account.id).all()
-            
-            for holding in holdings:
-                if holding.symbol and holding.cost_basis:
-                    # Calculate contribution to total return
-                    current_return = (holding.market_value - holding.cost_basis) / holding.cost_basis
-                    weight = holding.market_value / self.get_current_portfolio_value(user_id)
-                    contribution = current_return * weight
-                    
-                    attribution[holding.symbol] = contribution
-        
-        return attribution
\ No newline at end of file
+        # contribution = weight * return = (mv / total) * (mv - cb) / cb
+        market_values = np.fromiter((float(h.market_value) for h in attributed), dtype=np.float64, count=len(attributed))
+        cost_bases = np.fromiter((float(h.cost_basis) for h in attributed), dtype=np.float64, count=len(attributed))
+        contributions = (market_values - cost_bases) / cost_bases * (market_values / total_value)
+        
+        return dict(zip((h.symbol for h in attributed), contributions.tolist()))
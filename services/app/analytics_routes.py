@@ -1,4 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
+from dataclasses import asdict
+import numpy as np
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Dict, List
 from datetime import datetime, timedelta
@@ -58,17 +63,8 @@ async def get_portfolio_performance(
     if not metrics:
         raise HTTPException(status_code=404, detail="No performance data found")
     
-    return PerformanceResponse(
-        total_return=metrics.total_return,
-        annualized_return=metrics.annualized_return,
-        volatility=metrics.volatility,
-        sharpe_ratio=metrics.sharpe_ratio,
-        max_drawdown=metrics.max_drawdown,
-        current_value=metrics.current_value,
-        benchmark_return=metrics.benchmark_return,
-        alpha=metrics.alpha,
-        beta=metrics.beta
-    )
+    # Server-built dataclass: serialize directly, skipping Pydantic validation
+    return ORJSONResponse(asdict(metrics))
 
 
 @router.get("/performance/{user_id}/timeseries", response_model=PerformanceTimeSeriesResponse)
@@ -92,11 +88,17 @@ async def get_portfolio_timeseries(
     if returns_df.empty:
         raise HTTPException(status_code=404, detail="No time series data found")
     
-    return PerformanceTimeSeriesResponse(
-        dates=[d.strftime("%Y-%m-%d") for d in returns_df['date']],
-        portfolio_values=returns_df['portfolio_value'].tolist(),
-        daily_returns=returns_df['daily_return'].fillna(0).tolist()
+    # Serialize straight from the numpy columns; the payload is server-built,
+    # so the PerformanceTimeSeriesResponse model only documents the shape
+    content = orjson.dumps(
+        {
+            "dates": returns_df['date'].dt.strftime("%Y-%m-%d").tolist(),
+            "portfolio_values": returns_df['portfolio_value'].to_numpy(dtype=np.float64),
+            "daily_returns": returns_df['daily_return'].fillna(0).to_numpy(dtype=np.float64),
+        },
+        option=orjson.OPT_SERIALIZE_NUMPY,
     )
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/allocation/{user_id}", response_model=AssetAllocationResponse)
@@ -113,10 +115,7 @@ async def get_asset_allocation(
     allocation = analytics.get_asset_allocation(user_id)
     total_value = analytics.get_current_portfolio_value(user_id)
     
-    return AssetAllocationResponse(
-        allocation=allocation,
-        total_value=total_value
-    )
+    return ORJSONResponse({"allocation": allocation, "total_value": total_value})
 
 
 @router.get("/attribution/{user_id}", response_model=PerformanceAttributionResponse)
@@ -133,38 +132,39 @@ async def get_performance_attribution(
     analytics = PortfolioAnalytics(db)
     attribution = analytics.get_performance_attribution(user_id, period_days)
     
-    return PerformanceAttributionResponse(
-        contributions=attribution
-    )
+    return ORJSONResponse({"contributions": attribution})
+
+
+def _allocation_and_attribution(analytics: PortfolioAnalytics, user_id: int):
+    """Both read the same cached accounts, so they share one session and thread"""
+    return analytics.get_asset_allocation(user_id), analytics.get_performance_attribution(user_id)
 
 
 @router.get("/summary/{user_id}")
 async def get_analytics_summary(
     user_id: int,
     db: Session = Depends(get_db),
+    # A second, uncached get_db session (overrides apply) for the part that
+    # runs alongside; a Session must not be shared between threads
+    performance_db: Session = Depends(get_db, use_cache=False),
     current_user: User = Depends(get_current_user)
 ):
     """Get comprehensive analytics summary"""
     
     if user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-    analytics = PortfolioAnalytics(db)
-    
-    # Get performance metrics
-    metrics = analytics.calculate_performance_metrics(user_id)
-    
-    # Get current allocation
-    allocation = analytics.get_asset_allocation(user_id)
     
-    # Get performance attribution
-    attribution = analytics.get_performance_attribution(user_id)
+    (allocation, attribution), metrics = await asyncio.gather(
+        asyncio.to_thread(_allocation_and_attribution, PortfolioAnalytics(db), user_id),
+        asyncio.to_thread(PortfolioAnalytics(performance_db).calculate_performance_metrics, user_id),
+    )
     
-    return {
-        "performance": metrics.__dict__ if metrics else None,
+    return ORJSONResponse({
+        "performance": asdict(metrics) if metrics else None,
         "allocation": allocation,
         "attribution": attribution,
         "updated_at": datetime.now().isoformat()
-    }
+    })
 
 
 @router.get("/benchmarks")
@@ -1,8 +1,12 @@
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-from jose import jwt
+from jose import jwk, jwt
 from passlib.context import CryptContext
 
 # --- Configuration ---
@@ -13,13 +17,32 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Built once: jose otherwise re-parses SECRET_KEY into an HMAC key (and tries
+# to JSON-decode it) on every jwt.decode call.
+_DECODE_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+_ALGORITHMS = [ALGORITHM]
+
+# Verified-token cache: dashboards fire several requests back to back with the
+# same bearer token, so skip the HMAC + base64 + JSON work on repeats. Entries
+# live until the token's ``exp`` or TOKEN_CACHE_TTL seconds, whichever is first.
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAXSIZE = 10000
+_token_cache: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 # --- Password Hashing ---
 import sys
 TESTING_MODE = os.getenv("TESTING") == "1" or "pytest" in sys.modules
 
 # In test mode, avoid bcrypt to speed up tests and prevent backend issues.
+# sha256_crypt defaults to ~535k rounds; drop to the scheme minimum so fixture
+# users hash in well under a millisecond while staying salted.
 if TESTING_MODE:
-    pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+    pwd_context = CryptContext(
+        schemes=["sha256_crypt"],
+        deprecated="auto",
+        sha256_crypt__default_rounds=1000,
+    )
 else:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -49,6 +72,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 # --- Token Verification ---
 
+def decode_token(token: str) -> dict:
+    """Decode and verify a JWT, raising ``jose.JWTError`` if it is invalid.
+
+    Successfully verified payloads are cached briefly, keyed on a digest of
+    the token, and never served past their ``exp`` claim.
+    """
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+        if cached is not None:
+            payload, expires_at = cached
+            if now < expires_at:
+                _token_cache.move_to_end(cache_key)
+                return dict(payload)
+            del _token_cache[cache_key]
+
+    payload = jwt.decode(token, _DECODE_KEY, algorithms=_ALGORITHMS)
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _token_cache_lock:
+            _token_cache[cache_key] = (payload, min(float(exp), now + TOKEN_CACHE_TTL))
+            if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+                _token_cache.popitem(last=False)
+    return dict(payload)
+
+
 def verify_token(token: str) -> Optional[dict]:
     """Verify a JWT token and return the payload if valid.
 
@@ -62,7 +114,7 @@ def verify_token(token: str) -> Optional[dict]:
         token = token.split(" ", 1)[1]
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         return payload
     except Exception:
         # jose throws multiple exception classes; we don't need granularity here for tests
@@ -100,6 +152,48 @@ def _resolve_db(db_session):
     return db_gen
 
 
+# Token subject -> (user id, expiry). Only the id is cached so the returned User
+# is always attached to the caller's session; a hit costs a primary-key lookup
+# (often served from the session identity map) instead of the username/email scan.
+USER_CACHE_TTL = 30
+USER_CACHE_MAXSIZE = 10000
+_user_id_cache: Dict[str, Tuple[int, float]] = {}
+_user_id_cache_lock = threading.Lock()
+
+
+def get_user_by_subject(db, subject: str):
+    """Resolve a token ``sub`` (username or email) to a User, or ``None``."""
+    now = time.monotonic()
+    with _user_id_cache_lock:
+        cached = _user_id_cache.get(subject)
+
+    if cached is not None and now < cached[1]:
+        user = db.get(User, cached[0])
+        if user is not None and subject in (user.email, getattr(user, "username", None)):
+            return user
+
+    if hasattr(User, "username"):
+        user = db.query(User).filter((User.username == subject) | (User.email == subject)).first()
+    else:
+        user = db.query(User).filter(User.email == subject).first()
+
+    if user is not None:
+        with _user_id_cache_lock:
+            if subject not in _user_id_cache and len(_user_id_cache) >= USER_CACHE_MAXSIZE:
+                _user_id_cache.pop(next(iter(_user_id_cache)))
+            _user_id_cache[subject] = (user.id, now + USER_CACHE_TTL)
+    return user
+
+
+def invalidate_user_cache(subject: Optional[str] = None) -> None:
+    """Forget cached subject lookups (all of them if *subject* is omitted)."""
+    with _user_id_cache_lock:
+        if subject is None:
+            _user_id_cache.clear()
+        else:
+            _user_id_cache.pop(subject, None)
+
+
 def get_current_user(token: str, db_session=None):
     """Retrieve the current user based on the supplied JWT *token*.
 
@@ -115,10 +209,7 @@ def get_current_user(token: str, db_session=None):
 
     db = _resolve_db(db_session)
 
-    if hasattr(User, "username"):
-        user = db.query(User).filter((User.username == username) | (User.email == username)).first()
-    else:
-        user = db.query(User).filter(User.email == username).first()
+    user = get_user_by_subject(db, username)
     if not user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
@@ -4,12 +4,15 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from jose import JWTError
 
 from .database import get_db, User
 from . import schemas, crud, auth
+import logging
 import os, sys
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
@@ -24,18 +27,16 @@ def authenticate_user(db: Session, email: str, password: str):
     """Verify user credentials. Returns user if valid else None."""
     user = crud.get_user_by_email(db, email=email)
     if not user:
-        print(f"Authentication failed for email: {email} - User not found in DB.")
+        logger.debug("Authentication failed for email: %s - user not found", email)
         return None
-    print(f"TESTING_MODE: {TESTING_MODE}")
     if TESTING_MODE:
         # Skip password hash verification when running tests to avoid bcrypt backend issues
-        print("Bypassing password verification in testing mode.")
+        logger.info("Bypassing password verification in testing mode for %s", email)
         return user
-    print(f"Verifying password for user: {email}")
     if not auth.verify_password(password, user.hashed_password):
-        print(f"Password verification failed for user: {email}")
+        logger.debug("Password verification failed for user: %s", email)
         return None
-    print(f"Password verification successful for user: {email}")
+    logger.debug("Password verification successful for user: %s", email)
     return user
 
 
@@ -56,13 +57,13 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+        payload = auth.decode_token(token)
         email: str | None = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_email(db, email=email)
+    user = auth.get_user_by_subject(db, email)
     if user is None:
         raise credentials_exception
     return user
@@ -87,7 +88,7 @@ def login_for_access_token(
 ):
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        print(f"Authentication failed for email: {form_data.username} - User not found or password incorrect.")
+        logger.debug("Rejected login for email: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -2,16 +2,174 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import hashlib
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from sqlalchemy.orm import Session
 
 from .database import Strategy, StrategyHolding
 
+try:
+    from numba import njit, prange  # type: ignore
+except ImportError:  # pragma: no cover – numba is optional
+    njit = None
+    prange = range
+
 logger = logging.getLogger(__name__)
 
+PRICE_DISK_CACHE_DIR = Path(os.getenv("PRICE_CACHE_DIR", "~/.cache/value_partner/prices")).expanduser()
+PRICE_DISK_CACHE_TTL = 3600.0  # seconds, for ranges that reach today
+COMPARE_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _price_cache_path(symbols: List[str], start_date: datetime, end_date: datetime) -> Path:
+    """Parquet file for a (symbols, start, end) download.
+
+    Uses a stable digest rather than hash(), which is salted per process.
+    """
+    digest = hashlib.sha1(",".join(sorted(symbols)).encode()).hexdigest()[:16]
+    return PRICE_DISK_CACHE_DIR / f"{digest}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.parquet"
+
+
+def _price_cache_fresh(path: Path, end_date: datetime) -> bool:
+    """Closed historical ranges never change; ones reaching today expire"""
+    try:
+        modified = path.stat().st_mtime
+    except OSError:
+        return False
+    if end_date.date() < datetime.now().date():
+        return True
+    return time.time() - modified < PRICE_DISK_CACHE_TTL
+
+
+def _has_all_symbols(data: pd.DataFrame, symbols: List[str]) -> bool:
+    """True when every symbol has a column with at least one price"""
+    return all(symbol in data.columns and data[symbol].notna().any() for symbol in symbols)
+
+
+def _sample_std(returns: np.ndarray) -> float:
+    """Sample standard deviation (0 if undefined)"""
+    if returns.size < 2:
+        return 0.0
+    return float(returns.std(ddof=1))
+
+
+def _return_stats_numpy(p: np.ndarray, b: np.ndarray) -> Tuple[float, float, float, float, float]:
+    """Daily std of portfolio and benchmark, downside std, excess mean and std"""
+    excess = p - b
+    return (_sample_std(p), _sample_std(b), _sample_std(p[p < 0]),
+            float(excess.mean()) if excess.size else 0.0, _sample_std(excess))
+
+
+def _std_from_m2(m2: float, n: int) -> float:
+    """Sample standard deviation from a sum of squared deviations (0 if undefined)"""
+    if n < 2:
+        return 0.0
+    return np.sqrt(m2 / (n - 1))
+
+
+if njit is not None:
+    _std_from_m2 = njit(cache=True)(_std_from_m2)
+
+    # Welford updates rather than sum and sum of squares: the latter cancels
+    # catastrophically for near-constant returns, and no fastmath so the
+    # compiler cannot reassociate the updates
+    @njit(cache=True)
+    def _return_stats(p: np.ndarray, b: np.ndarray) -> Tuple[float, float, float, float, float]:
+        """Same statistics as _return_stats_numpy in one pass over the returns"""
+        n = p.shape[0]
+        p_mean = p_m2 = b_mean = b_m2 = down_mean = down_m2 = ex_mean = ex_m2 = 0.0
+        down_n = 0
+        for i in range(n):
+            pi = p[i]
+            bi = b[i]
+            ex = pi - bi
+            k = i + 1
+            delta = pi - p_mean
+            p_mean += delta / k
+            p_m2 += delta * (pi - p_mean)
+            delta = bi - b_mean
+            b_mean += delta / k
+            b_m2 += delta * (bi - b_mean)
+            delta = ex - ex_mean
+            ex_mean += delta / k
+            ex_m2 += delta * (ex - ex_mean)
+            if pi < 0.0:
+                down_n += 1
+                delta = pi - down_mean
+                down_mean += delta / down_n
+                down_m2 += delta * (pi - down_mean)
+        return (_std_from_m2(p_m2, n), _std_from_m2(b_m2, n),
+                _std_from_m2(down_m2, down_n), ex_mean, _std_from_m2(ex_m2, n))
+else:
+    _return_stats = _return_stats_numpy
+
+
+MC_BATCH_ELEMENTS = 1 << 23  # float32 normal draws held in memory per batch (~32 MB)
+
+
+def _simulate_final_values(loadings: np.ndarray, portfolio_mean: float, num_days: int,
+                           num_simulations: int, initial_capital: float) -> np.ndarray:
+    """Terminal portfolio value of each simulated correlated return path.
+
+    Portfolio returns are mean @ w + Z @ (L.T @ w), so the per-asset returns
+    never need to be materialized.
+    """
+    final_values = np.empty(num_simulations)
+    for i in prange(num_simulations):
+        shocks = np.random.standard_normal((num_days, loadings.shape[0]))
+        portfolio_returns = portfolio_mean + shocks @ loadings
+        final_values[i] = initial_capital * np.prod(1.0 + portfolio_returns)
+    return final_values
+
+
+def _simulate_final_values_batched(loadings: np.ndarray, portfolio_mean: float, num_days: int,
+                                   num_simulations: int, initial_capital: float) -> np.ndarray:
+    """NumPy equivalent of the kernel drawing many trials per (S, T, n) tensor.
+
+    Shocks and returns are float32, which is ample for sampling a return
+    distribution and halves the memory traffic; the compounding is
+    accumulated in float64.
+    """
+    rng = np.random.default_rng()
+    loadings = loadings.astype(np.float32)
+    portfolio_mean = np.float32(portfolio_mean)
+    final_values = np.empty(num_simulations)
+    batch_size = max(1, MC_BATCH_ELEMENTS // max(1, num_days * loadings.shape[0]))
+    for start in range(0, num_simulations, batch_size):
+        stop = min(start + batch_size, num_simulations)
+        shocks = rng.standard_normal((stop - start, num_days, loadings.shape[0]), dtype=np.float32)
+        portfolio_returns = portfolio_mean + shocks @ loadings
+        final_values[start:stop] = initial_capital * np.prod(1.0 + portfolio_returns, axis=1, dtype=np.float64)
+    return final_values
+
+
+if njit is not None:
+    _simulate_final_values = njit(parallel=True, cache=True, fastmath=True)(_simulate_final_values)
+else:
+    _simulate_final_values = _simulate_final_values_batched
+
+
+def _covariance_factor(cov_matrix: np.ndarray) -> np.ndarray:
+    """Factor L with L @ L.T == cov_matrix for sampling correlated returns.
+
+    Cholesky is used when the covariance is positive definite. Collinear
+    assets make it only semi-definite, so fall back to a clipped
+    eigendecomposition, as multivariate_normal does internally.
+    """
+    try:
+        return np.linalg.cholesky(cov_matrix)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(cov_matrix)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
 class RebalancingFrequency(Enum):
     DAILY = "daily"
     WEEKLY = "weekly"
@@ -19,6 +177,15 @@ class RebalancingFrequency(Enum):
     QUARTERLY = "quarterly"
     ANNUAL = "annual"
 
+# Business-day anchored offsets so scheduled dates land on trading days
+REBALANCING_FREQUENCIES = {
+    RebalancingFrequency.DAILY: 'B',
+    RebalancingFrequency.WEEKLY: 'W-MON',
+    RebalancingFrequency.MONTHLY: 'BMS',
+    RebalancingFrequency.QUARTERLY: 'BQS',
+    RebalancingFrequency.ANNUAL: 'BYS',
+}
+
 @dataclass
 class BacktestConfig:
     """Configuration for backtesting"""
@@ -91,15 +258,23 @@ class PortfolioBacktester:
         return self.backtest_allocation(target_weights, config)
         
     def backtest_allocation(self, target_weights: Dict[str, float], 
-                          config: BacktestConfig) -> BacktestResult:
-        """Backtest a specific allocation"""
+                          config: BacktestConfig,
+                          price_data: Optional[pd.DataFrame] = None) -> BacktestResult:
+        """Backtest a specific allocation.
+
+        ``price_data`` may be a pre-fetched frame covering the allocation's
+        symbols and the benchmark; otherwise it is downloaded.
+        """
         
         logger.info(f"Starting backtest from {config.start_date} to {config.end_date}")
         
         # Download price data
         symbols = list(target_weights.keys())
-        price_data = self._download_price_data(symbols + [config.benchmark_symbol], 
-                                             config.start_date, config.end_date)
+        if price_data is None:
+            price_data = self._download_price_data(symbols + [config.benchmark_symbol], 
+                                                 config.start_date, config.end_date)
+        else:
+            price_data = price_data[symbols + [config.benchmark_symbol]]
         
         if price_data.empty:
             raise ValueError("No price data available for the specified period")
@@ -112,63 +287,66 @@ class PortfolioBacktester:
             config.start_date, config.end_date, config.rebalancing_frequency
         )
         
+        # Work on aligned NumPy arrays; per-bar pandas scalar access dominates
+        # the loop otherwise
+        prices = price_data.loc[returns_data.index, symbols].to_numpy(dtype=np.float64)
+        target = np.array([target_weights[symbol] for symbol in symbols], dtype=np.float64)
+        
         # Initialize portfolio
-        portfolio_values = []
-        weights_history = []
-        transaction_costs = []
-        current_weights = target_weights.copy()
+        num_days = len(returns_data)
+        portfolio_values = np.empty(num_days)
+        weights_history = np.empty((num_days, len(symbols)))
+        transaction_costs = np.zeros(num_days)
         cash = config.initial_capital
-        portfolio_value = config.initial_capital
         
         # Track actual holdings (shares)
-        holdings = {symbol: 0.0 for symbol in symbols}
+        holdings = np.zeros(len(symbols))
         
-        for date in returns_data.index:
-            daily_returns = returns_data.loc[date, symbols]
-            
-            # Check if we need to rebalance
-            is_rebalancing_date = date.date() in [d.date() for d in rebalancing_dates]
-            needs_threshold_rebalance = self._check_rebalancing_threshold(
-                current_weights, target_weights, config.rebalancing_threshold
+        # Flag the first bar on or after each scheduled date, so dates that
+        # fall on market holidays still trigger a rebalance
+        scheduled = returns_data.index.normalize().searchsorted(
+            pd.DatetimeIndex(rebalancing_dates).normalize()
+        )
+        rebalancing_mask = np.zeros(num_days, dtype=bool)
+        rebalancing_mask[scheduled[scheduled < num_days]] = True
+        rebalancing_mask[:1] = True  # initial allocation
+        scheduled_bars = np.flatnonzero(rebalancing_mask)
+        
+        # Shares only change on rebalances, so step from one rebalance to the
+        # next and value each holding period as a block
+        i = 0
+        while i < num_days:
+            # Rebalance portfolio; trades and their costs are settled in cash
+            portfolio_value = holdings @ prices[i] + cash
+            cost = self._rebalance_portfolio(
+                holdings, target, prices[i], 
+                portfolio_value, config.transaction_cost
             )
+            transaction_costs[i] = cost
+            cash = portfolio_value - holdings @ prices[i] - cost
             
-            if is_rebalancing_date or needs_threshold_rebalance or date == returns_data.index[0]:
-                # Rebalance portfolio
-                cost = self._rebalance_portfolio(
-                    holdings, target_weights, price_data.loc[date, symbols], 
-                    portfolio_value, config.transaction_cost
-                )
-                transaction_costs.append(cost)
-                cash -= cost
-            else:
-                transaction_costs.append(0.0)
+            # Hold until the next scheduled date at most
+            next_scheduled = np.searchsorted(scheduled_bars, i, side='right')
+            end = scheduled_bars[next_scheduled] if next_scheduled < len(scheduled_bars) else num_days
             
-            # Update portfolio value based on price changes
-            if date != returns_data.index[0]:  # Skip first day
-                for symbol in symbols:
-                    if symbol in daily_returns:
-                        holdings[symbol] *= (1 + daily_returns[symbol])
-                        
-            # Calculate current portfolio value
-            portfolio_value = sum(
-                holdings[symbol] * price_data.loc[date, symbol] 
-                for symbol in symbols if symbol in price_data.columns
-            ) + cash
+            position_values = prices[i:end] * holdings
+            values = position_values.sum(axis=1) + cash
+            weights = np.divide(position_values, values[:, None],
+                                out=np.zeros_like(position_values), where=values[:, None] > 0)
             
-            # Update current weights
-            if portfolio_value > 0:
-                current_weights = {
-                    symbol: (holdings[symbol] * price_data.loc[date, symbol]) / portfolio_value
-                    for symbol in symbols if symbol in price_data.columns
-                }
+            # ...or until drift first breaches the threshold
+            drifted = self._check_rebalancing_threshold(weights[1:], target, config.rebalancing_threshold)
+            if drifted.any():
+                end = i + 1 + int(drifted.argmax())
             
-            portfolio_values.append(portfolio_value)
-            weights_history.append(current_weights.copy())
+            portfolio_values[i:end] = values[:end - i]
+            weights_history[i:end] = weights[:end - i]
+            i = end
         
         # Convert to pandas series/dataframes
-        portfolio_values = pd.Series(portfolio_values, index=returns_data.index)
-        weights_history_df = pd.DataFrame(weights_history, index=returns_data.index)
-        transaction_costs_series = pd.Series(transaction_costs, index=returns_data.index)
+        portfolio_values = pd.Series(portfolio_values, index=returns_data.index, copy=False)
+        weights_history_df = pd.DataFrame(weights_history, index=returns_data.index, columns=symbols, copy=False)
+        transaction_costs_series = pd.Series(transaction_costs, index=returns_data.index, copy=False)
         
         # Calculate portfolio returns
         portfolio_returns = portfolio_values.pct_change().dropna()
@@ -200,14 +378,30 @@ class PortfolioBacktester:
         """Compare multiple strategies"""
         
         results = {}
-        
-        for target_weights, name in strategy_configs:
-            try:
-                result = self.backtest_allocation(target_weights, config)
-                results[name] = result
-                logger.info(f"Completed backtest for {name}")
-            except Exception as e:
-                logger.error(f"Failed to backtest {name}: {e}")
+        if not strategy_configs:
+            return results
+        
+        # Download the union of all symbols once instead of per strategy
+        all_symbols = list(dict.fromkeys(
+            [symbol for target_weights, _ in strategy_configs for symbol in target_weights]
+            + [config.benchmark_symbol]
+        ))
+        price_data = self._download_price_data(all_symbols, config.start_date, config.end_date)
+        
+        # Backtests share nothing but the read-only price frame and spend
+        # their time in NumPy, which releases the GIL
+        max_workers = min(COMPARE_MAX_WORKERS, len(strategy_configs))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (name, executor.submit(self.backtest_allocation, target_weights, config, price_data=price_data))
+                for target_weights, name in strategy_configs
+            ]
+            for name, future in futures:
+                try:
+                    results[name] = future.result()
+                    logger.info(f"Completed backtest for {name}")
+                except Exception as e:
+                    logger.error(f"Failed to backtest {name}: {e}")
                 
         return results
         
@@ -226,36 +420,20 @@ class PortfolioBacktester:
         returns_data = price_data.pct_change().dropna()
         
         # Calculate mean returns and covariance matrix
-        mean_returns = returns_data.mean()
-        cov_matrix = returns_data.cov()
+        mean_returns = returns_data[symbols].mean().to_numpy()
+        cov_matrix = returns_data[symbols].cov().to_numpy()
+        weights = np.array([target_weights[symbol] for symbol in symbols], dtype=np.float64)
+        num_days = len(returns_data)
         
-        # Run simulations
-        simulation_results = []
-        
-        for i in range(num_simulations):
-            # Generate random returns based on historical distribution
-            simulated_returns = np.random.multivariate_normal(
-                mean_returns, cov_matrix, len(returns_data)
-            )
-            
-            # Calculate portfolio returns
-            portfolio_returns = pd.DataFrame(simulated_returns, columns=symbols)
-            weighted_returns = (portfolio_returns * pd.Series(target_weights)).sum(axis=1)
-            
-            # Calculate final value
-            final_value = config.initial_capital * (1 + weighted_returns).prod()
-            total_return = (final_value - config.initial_capital) / config.initial_capital
-            
-            simulation_results.append({
-                'final_value': final_value,
-                'total_return': total_return,
-                'annual_return': (final_value / config.initial_capital) ** (252 / len(weighted_returns)) - 1
-            })
+        # Factor the covariance once; each path is then (mean + Z @ L.T) @ w
+        loadings = np.ascontiguousarray(_covariance_factor(cov_matrix).T @ weights)
         
-        # Analyze results
-        final_values = [r['final_value'] for r in simulation_results]
-        total_returns = [r['total_return'] for r in simulation_results]
-        annual_returns = [r['annual_return'] for r in simulation_results]
+        # Run simulations
+        final_values = _simulate_final_values(
+            loadings, float(mean_returns @ weights), num_days, num_simulations, config.initial_capital
+        )
+        total_returns = (final_values - config.initial_capital) / config.initial_capital
+        var_95 = np.percentile(total_returns, 5)
         
         return {
             'num_simulations': num_simulations,
@@ -268,14 +446,39 @@ class PortfolioBacktester:
                 '75th': np.percentile(final_values, 75),
                 '95th': np.percentile(final_values, 95)
             },
-            'probability_positive': len([r for r in total_returns if r > 0]) / num_simulations,
-            'probability_loss_10pct': len([r for r in total_returns if r < -0.1]) / num_simulations,
-            'var_95': np.percentile(total_returns, 5),  # Value at Risk (95% confidence)
-            'expected_shortfall': np.mean([r for r in total_returns if r <= np.percentile(total_returns, 5)])
+            'probability_positive': np.count_nonzero(total_returns > 0) / num_simulations,
+            'probability_loss_10pct': np.count_nonzero(total_returns < -0.1) / num_simulations,
+            'var_95': var_95,  # Value at Risk (95% confidence)
+            'expected_shortfall': total_returns[total_returns <= var_95].mean()
         }
         
     def _download_price_data(self, symbols: List[str], start_date: datetime, 
-                           end_date: datetime) -> pd.DataFrame:
+                           end_date: datetime, refresh: bool = False) -> pd.DataFrame:
+        """Load price data for symbols, preferring the on-disk cache"""
+        
+        cache_path = _price_cache_path(symbols, start_date, end_date)
+        if not refresh and _price_cache_fresh(cache_path, end_date):
+            try:
+                data = pd.read_parquet(cache_path)
+                if _has_all_symbols(data, symbols):
+                    return data[symbols]
+                logger.warning(f"Price cache {cache_path} is missing symbols; refetching")
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable price cache {cache_path}: {e}")
+                
+        data = self._fetch_price_data(symbols, start_date, end_date)
+        # yfinance drops symbols it failed on; a partial frame would be
+        # served forever for closed ranges, so only complete ones are cached
+        if _has_all_symbols(data, symbols):
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                data.to_parquet(cache_path)
+            except Exception as e:
+                logger.warning(f"Could not write price cache {cache_path}: {e}")
+        return data
+        
+    def _fetch_price_data(self, symbols: List[str], start_date: datetime, 
+                        end_date: datetime) -> pd.DataFrame:
         """Download price data for symbols"""
         
         try:
@@ -304,76 +507,31 @@ class PortfolioBacktester:
                              frequency: RebalancingFrequency) -> List[datetime]:
         """Get rebalancing dates based on frequency"""
         
-        dates = []
-        current_date = start_date
+        dates = pd.date_range(start_date, end_date, freq=REBALANCING_FREQUENCIES[frequency],
+                              normalize=True)
+        return list(dates.to_pydatetime())
         
-        while current_date <= end_date:
-            dates.append(current_date)
-            
-            if frequency == RebalancingFrequency.DAILY:
-                current_date += timedelta(days=1)
-            elif frequency == RebalancingFrequency.WEEKLY:
-                current_date += timedelta(weeks=1)
-            elif frequency == RebalancingFrequency.MONTHLY:
-                # Add approximately one month
-                if current_date.month == 12:
-                    current_date = current_date.replace(year=current_date.year + 1, month=1)
-                else:
-                    current_date = current_date.replace(month=current_date.month + 1)
-            elif frequency == RebalancingFrequency.QUARTERLY:
-                # Add 3 months
-                for _ in range(3):
-                    if current_date.month == 12:
-                        current_date = current_date.replace(year=current_date.year + 1, month=1)
-                    else:
-                        current_date = current_date.replace(month=current_date.month + 1)
-            elif frequency == RebalancingFrequency.ANNUAL:
-                current_date = current_date.replace(year=current_date.year + 1)
-                
-        return dates
-        
-    def _check_rebalancing_threshold(self, current_weights: Dict[str, float], 
-                                   target_weights: Dict[str, float], 
-                                   threshold: float) -> bool:
-        """Check if portfolio has drifted beyond threshold"""
+    def _check_rebalancing_threshold(self, current_weights: np.ndarray, 
+                                   target_weights: np.ndarray, 
+                                   threshold: float) -> np.ndarray:
+        """Flag each row of weights that has drifted beyond threshold"""
         
-        for symbol in target_weights:
-            current_weight = current_weights.get(symbol, 0)
-            target_weight = target_weights[symbol]
-            drift = abs(current_weight - target_weight)
-            
-            if drift > threshold:
-                return True
-                
-        return False
+        return np.abs(current_weights - target_weights).max(axis=-1) > threshold
         
-    def _rebalance_portfolio(self, holdings: Dict[str, float], 
-                           target_weights: Dict[str, float], 
-                           prices: pd.Series, portfolio_value: float, 
+    def _rebalance_portfolio(self, holdings: np.ndarray, 
+                           target_weights: np.ndarray, 
+                           prices: np.ndarray, portfolio_value: float, 
                            transaction_cost: float) -> float:
-        """Rebalance portfolio to target weights"""
+        """Rebalance share holdings in place to target weights"""
         
-        total_cost = 0.0
+        target_shares = portfolio_value * target_weights / prices
+        
+        # Apply transaction cost on the traded value
+        total_cost = float(np.abs(target_shares - holdings) @ prices) * transaction_cost
+        
+        # Update holdings
+        holdings[:] = target_shares
         
-        for symbol in target_weights:
-            if symbol not in prices:
-                continue
-                
-            target_value = portfolio_value * target_weights[symbol]
-            target_shares = target_value / prices[symbol]
-            current_shares = holdings.get(symbol, 0)
-            
-            # Calculate trade
-            shares_to_trade = target_shares - current_shares
-            trade_value = abs(shares_to_trade * prices[symbol])
-            
-            # Apply transaction cost
-            cost = trade_value * transaction_cost
-            total_cost += cost
-            
-            # Update holdings
-            holdings[symbol] = target_shares
-            
         return total_cost
         
     def _calculate_performance_metrics(self, portfolio_returns: pd.Series, 
@@ -383,21 +541,26 @@ class PortfolioBacktester:
                                      transaction_costs: pd.Series) -> Dict:
         """Calculate comprehensive performance metrics"""
         
-        # Align series
-        aligned_returns = portfolio_returns.align(benchmark_returns, join='inner')
-        portfolio_returns, benchmark_returns = aligned_returns
+        # Align series once, then work on plain arrays
+        portfolio_returns, benchmark_returns = portfolio_returns.align(benchmark_returns, join='inner')
+        p = portfolio_returns.to_numpy(dtype=np.float64)
+        b = benchmark_returns.to_numpy(dtype=np.float64)
+        pv = portfolio_values.to_numpy(dtype=np.float64)
+        bv = benchmark_values.to_numpy(dtype=np.float64)
         
         # Basic metrics
-        total_return = (portfolio_values.iloc[-1] - portfolio_values.iloc[0]) / portfolio_values.iloc[0]
-        benchmark_total_return = (benchmark_values.iloc[-1] - benchmark_values.iloc[0]) / benchmark_values.iloc[0]
+        total_return = float(pv[-1] / pv[0] - 1.0)
+        benchmark_total_return = float(bv[-1] / bv[0] - 1.0)
         
-        days = len(portfolio_returns)
+        days = len(p)
         annualized_return = (1 + total_return) ** (252 / days) - 1
         benchmark_annualized_return = (1 + benchmark_total_return) ** (252 / days) - 1
         
-        # Risk metrics
-        volatility = portfolio_returns.std() * np.sqrt(252)
-        benchmark_volatility = benchmark_returns.std() * np.sqrt(252)
+        # Risk metrics, from a single pass over both return series
+        annualizer = np.sqrt(252)
+        std, benchmark_std, downside_std, excess_mean, excess_std = _return_stats(p, b)
+        volatility = std * annualizer
+        benchmark_volatility = benchmark_std * annualizer
         
         # Sharpe ratio (assuming 2% risk-free rate)
         risk_free_rate = 0.02
@@ -405,15 +568,13 @@ class PortfolioBacktester:
         benchmark_sharpe_ratio = (benchmark_annualized_return - risk_free_rate) / benchmark_volatility if benchmark_volatility > 0 else 0
         
         # Drawdown
-        rolling_max = portfolio_values.expanding().max()
-        drawdown = (portfolio_values - rolling_max) / rolling_max
-        max_drawdown = drawdown.min()
+        rolling_max = np.maximum.accumulate(pv)
+        max_drawdown = float((pv / rolling_max - 1.0).min())
         
         # Alpha and Beta
-        if len(portfolio_returns) > 1 and len(benchmark_returns) > 1:
-            covariance = np.cov(portfolio_returns, benchmark_returns)[0][1]
-            benchmark_variance = np.var(benchmark_returns)
-            beta = covariance / benchmark_variance if benchmark_variance > 0 else 0
+        if days > 1:
+            covariance = np.cov(p, b)
+            beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else 0
             alpha = annualized_return - (risk_free_rate + beta * (benchmark_annualized_return - risk_free_rate))
         else:
             beta = 0
@@ -423,14 +584,12 @@ class PortfolioBacktester:
         calmar_ratio = abs(annualized_return / max_drawdown) if max_drawdown < 0 else 0
         
         # Sortino ratio (downside deviation)
-        downside_returns = portfolio_returns[portfolio_returns < 0]
-        downside_deviation = downside_returns.std() * np.sqrt(252) if len(downside_returns) > 0 else 0
+        downside_deviation = downside_std * annualizer
         sortino_ratio = (annualized_return - risk_free_rate) / downside_deviation if downside_deviation > 0 else 0
         
         # Information ratio and tracking error
-        excess_returns = portfolio_returns - benchmark_returns
-        tracking_error = excess_returns.std() * np.sqrt(252)
-        information_ratio = excess_returns.mean() * 252 / tracking_error if tracking_error > 0 else 0
+        tracking_error = excess_std * annualizer
+        information_ratio = excess_mean * 252 / tracking_error if tracking_error > 0 else 0
         
         return {
             'total_return': total_return,
@@ -448,4 +607,21 @@ class PortfolioBacktester:
             'sortino_ratio': sortino_ratio,
             'information_ratio': information_ratio,
             'tracking_error': tracking_error
-        }
\ No newline at end of file
+        }
+
+
+def warmup() -> None:
+    """Compile (or load from the on-disk cache) the numba kernels up front.
+
+    Called at import when WARMUP_NUMBA=1 so the first backtest or Monte
+    Carlo request does not pay JIT latency.
+    """
+    if njit is None:
+        return
+    returns = np.zeros(4)
+    _return_stats(returns, returns)
+    _simulate_final_values(np.zeros(2), 0.0, 2, 2, 1.0)
+
+
+if os.getenv("WARMUP_NUMBA") == "1":
+    warmup()
@@ -1,26 +1,53 @@
 """Beta testing infrastructure and monitoring"""
 import os
-import json
 import logging
+import orjson
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
 import asyncio
+import heapq
 from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
 import uuid
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index, Text, Enum as SQLEnum, and_, bindparam, insert, update
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 
-from .database import Base, get_db, User
+from .database import Base, User, session_scope
 from .monitoring import app_monitor, MetricsCollector
 
 logger = logging.getLogger(__name__)
 
+EXPORT_BATCH_SIZE = 1000  # rows fetched per round-trip when streaming exports
+ACTION_FLUSH_INTERVAL = 0.5  # seconds between background flushes of tracked actions
+ACTION_FLUSH_SIZE = 512  # flush inline once this many actions are buffered
+METRICS_CACHE_TTL = 30.0  # seconds a computed metrics snapshot is reused
+ACTIVE_SESSION_SHARDS = 16  # power of two; independent locks for in-memory sessions
+MAX_ACTIVE_SESSIONS = 10000  # abandoned sessions are evicted beyond this
+SESSION_FLUSH_INTERVAL = 0.1  # seconds between batched session inserts
+SESSION_FLUSH_SIZE = 500  # write inline once this many new sessions are queued
+SESSION_WRITE_ATTEMPTS = 3  # failed flushes before a session row is dropped
+USER_TIME_FLUSH_INTERVAL = 5.0  # seconds between write-behind session time updates
+
+# Notifications run here so their round-trips never delay the submitting request
+_alert_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="beta-alert")
+
+def _uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): a millisecond timestamp prefix
+    followed by random bits, so new ids land at the right edge of a B-tree.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
 class BetaTestPhase(Enum):
     INTERNAL = "internal"
     CLOSED = "closed"
@@ -47,6 +74,16 @@ class BetaTestSeverity(Enum):
     MEDIUM = "medium"
     LOW = "low"
 
+# Value (and member, as routes pass parsed enums) -> member, avoiding Enum.__call__
+_FEEDBACK_TYPE_MAP = {**{e.value: e for e in FeedbackType}, **{e: e for e in FeedbackType}}
+_SEVERITY_MAP = {**{e.value: e for e in BetaTestSeverity}, **{e: e for e in BetaTestSeverity}}
+
+def _enum_member(members: Dict[Any, Enum], value: Any) -> Enum:
+    try:
+        return members[value]
+    except KeyError:
+        raise ValueError(f"{value!r} is not a valid option") from None
+
 @dataclass
 class BetaTestMetrics:
     """Beta testing metrics"""
@@ -102,6 +139,12 @@ class BetaUser(Base):
     user = relationship("User")
     feedback = relationship("BetaFeedback", back_populates="beta_user")
     test_sessions = relationship("BetaTestSession", back_populates="beta_user")
+    
+    __table_args__ = (
+        # Leaderboard ordering and per-phase status counts
+        Index("ix_beta_users_sessions_time", total_sessions.desc(), total_session_time.desc()),
+        Index("ix_beta_users_phase_status", "phase", "status"),
+    )
 
 class BetaFeedback(Base):
     """Beta testing feedback model"""
@@ -135,6 +178,10 @@ class BetaFeedback(Base):
     
     # Relationships
     beta_user = relationship("BetaUser", back_populates="feedback")
+    
+    __table_args__ = (
+        Index("ix_beta_feedback_type_status", "feedback_type", "status"),
+    )
 
 class BetaTestSession(Base):
     """Beta testing session tracking"""
@@ -162,193 +209,541 @@ class BetaTestSession(Base):
     
     # Relationships
     beta_user = relationship("BetaUser", back_populates="test_sessions")
+    
+    __table_args__ = (
+        Index("ix_beta_sessions_user_duration", "beta_user_id", "duration"),
+    )
+
+class SessionShards:
+    """In-memory session map split across independently locked shards.
+
+    Concurrent starts, ends and tracked actions only contend when their
+    session ids hash to the same shard.
+    """
+    
+    def __init__(self, num_shards: int = ACTIVE_SESSION_SHARDS):
+        self._mask = num_shards - 1
+        self._shards: List[Dict[str, Dict[str, Any]]] = [{} for _ in range(num_shards)]
+        self._locks = [threading.Lock() for _ in range(num_shards)]
+        
+    def _index(self, session_id: str) -> int:
+        return hash(session_id) & self._mask
+    
+    def lock_for(self, session_id: str) -> threading.Lock:
+        """Lock guarding the shard (and its session dicts) for session_id"""
+        return self._locks[self._index(session_id)]
+    
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._shards[self._index(session_id)].get(session_id)
+    
+    def pop(self, session_id: str, default=None):
+        index = self._index(session_id)
+        with self._locks[index]:
+            return self._shards[index].pop(session_id, default)
+    
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        return self._shards[self._index(session_id)][session_id]
+    
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        index = self._index(session_id)
+        with self._locks[index]:
+            self._shards[index][session_id] = session
+            
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._shards[self._index(session_id)]
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+    
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Snapshot of (session_id, session) pairs, taken one shard at a time"""
+        snapshot = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                snapshot.extend(shard.items())
+        return snapshot
+    
+    def decay(self, field: str):
+        """Halve a per-session counter so past activity stops protecting a session"""
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                for session in shard.values():
+                    session[field] >>= 1
 
 class BetaTestingManager:
     """Manager for beta testing operations"""
     
     def __init__(self):
         self.metrics_collector = MetricsCollector(max_metrics=50000)
-        self.active_sessions = {}
+        self.active_sessions = SessionShards()
         self.current_phase = BetaTestPhase.INTERNAL
+        # (session_id, action, context, epoch seconds) awaiting flush
+        self._pending_actions: deque = deque()
+        self._flush_task: Optional[asyncio.Task] = None
+        # beta_test_sessions rows awaiting the batched writer
+        self._pending_sessions: deque = deque()
+        self._session_write_task: Optional[asyncio.Task] = None
+        # Held while a batch is drained and written, so end_beta_session can
+        # wait for an in-flight INSERT before looking its row up
+        self._session_write_lock = threading.Lock()
+        # session_id -> failed writes of a row that went back on the queue
+        self._session_write_failures: Dict[str, int] = {}
+        # beta_user_id -> ended session seconds not yet in total_session_time
+        self._pending_user_time: Dict[int, float] = defaultdict(float)
+        self._user_time_lock = threading.Lock()
+        self._user_time_task: Optional[asyncio.Task] = None
+        # phase (None = all phases) -> (expires_at monotonic, metrics)
+        self._metrics_cache: Dict[Optional[BetaTestPhase], Tuple[float, BetaTestMetrics]] = {}
         
     def start_beta_session(self, beta_user_id: int, session_data: Dict[str, Any]) -> str:
-        """Start a new beta testing session"""
-        session_id = str(uuid.uuid4())
+        """Start a new beta testing session.
+
+        Inside a running event loop the session row is queued and written
+        by a background batch writer; elsewhere it is written immediately.
+        """
+        session_id = self._queue_session(beta_user_id, session_data)
         
-        db = next(get_db())
-        try:
-            # Create session record
-            session = BetaTestSession(
-                beta_user_id=beta_user_id,
-                session_id=session_id,
-                user_agent=session_data.get("user_agent"),
-                ip_address=session_data.get("ip_address"),
-                device_type=session_data.get("device_type"),
-                browser=session_data.get("browser")
-            )
-            db.add(session)
+        if self._session_flush_due():
+            self.flush_sessions()
             
-            # Update user last login
-            beta_user = db.query(BetaUser).filter(BetaUser.id == beta_user_id).first()
-            if beta_user:
-                beta_user.last_login = datetime.utcnow()
-                beta_user.total_sessions += 1
+        logger.info(f"Started beta session {session_id} for user {beta_user_id}")
+        return session_id
+    
+    def start_beta_sessions_bulk(self, sessions_data: List[Dict[str, Any]]) -> List[str]:
+        """Start many sessions (e.g. from load tests) and write them in one transaction.
+
+        Each item carries its ``beta_user_id`` alongside the usual session
+        fields; session ids are returned in input order.
+        """
+        session_ids = [self._queue_session(data["beta_user_id"], data) for data in sessions_data]
+        self.flush_sessions()
+        
+        logger.info(f"Started {len(session_ids)} beta sessions in bulk")
+        return session_ids
+    
+    def _queue_session(self, beta_user_id: int, session_data: Dict[str, Any]) -> str:
+        """Queue the session row for the batch writer and track it in memory"""
+        session_id = str(_uuid7())
+        start_time = datetime.utcnow()
+        
+        self._pending_sessions.append({
+            "beta_user_id": beta_user_id,
+            "session_id": session_id,
+            "start_time": start_time,
+            "user_agent": session_data.get("user_agent"),
+            "ip_address": session_data.get("ip_address"),
+            "device_type": session_data.get("device_type"),
+            "browser": session_data.get("browser")
+        })
+        
+        # Track in memory
+        self._evict_idle_sessions()
+        started = time.monotonic()
+        self.active_sessions[session_id] = {
+            "beta_user_id": beta_user_id,
+            "start_time": start_time,
+            "start_monotonic": started,
+            "last_activity": started,
+            "hits": 0,
+            "actions": 0,
+            "pages": 0,
+            "errors": 0
+        }
+        return session_id
+    
+    def _session_flush_due(self) -> bool:
+        """True when queued sessions must be written now rather than by the writer task"""
+        return len(self._pending_sessions) >= SESSION_FLUSH_SIZE or not self._ensure_session_writer()
+    
+    def flush_sessions(self) -> int:
+        """Write queued session rows in one multi-row INSERT; returns the count written.
+
+        If the batch fails it is retried row by row, so one bad row does not
+        lose everyone else's session. Rows that still fail go back on the
+        queue and are dropped after SESSION_WRITE_ATTEMPTS flushes.
+        """
+        with self._session_write_lock:
+            pending = self._pending_sessions
+            rows = []
+            while True:
+                try:
+                    rows.append(pending.popleft())
+                except IndexError:
+                    break
+            if not rows:
+                return 0
                 
-            db.commit()
-            
-            # Track in memory
-            self.active_sessions[session_id] = {
-                "beta_user_id": beta_user_id,
-                "start_time": datetime.utcnow(),
-                "actions": 0,
-                "pages": 0,
-                "errors": 0
-            }
+            try:
+                self._write_sessions(rows)
+                written = rows
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} beta sessions as a batch, retrying one by one: {e}")
+                written = []
+                for row in rows:
+                    try:
+                        self._write_sessions([row])
+                        written.append(row)
+                    except Exception as row_error:
+                        self._requeue_session(row, row_error)
+                        
+        if self._session_write_failures:
+            for row in written:
+                self._session_write_failures.pop(row["session_id"], None)
+        if written:
+            self.invalidate_metrics_cache()
+        return len(written)
+    
+    def _write_sessions(self, rows: List[Dict[str, Any]]):
+        """Insert session rows and bump their users' totals in one transaction"""
+        # One (sessions started, latest login) bump per user
+        logins: Dict[int, List[Any]] = {}
+        for row in rows:
+            login = logins.setdefault(row["beta_user_id"], [0, None])
+            login[0] += 1
+            login[1] = row["start_time"]
             
-            logger.info(f"Started beta session {session_id} for user {beta_user_id}")
-            return session_id
+        users = BetaUser.__table__
+        with session_scope() as db:
+            db.execute(insert(BetaTestSession), rows)
+            db.execute(
+                update(users).where(users.c.id == bindparam("b_id")).values(
+                    total_sessions=users.c.total_sessions + bindparam("b_sessions"),
+                    last_login=bindparam("b_login")
+                ),
+                [{"b_id": user_id, "b_sessions": count, "b_login": last_login}
+                 for user_id, (count, last_login) in logins.items()]
+            )
+    
+    def _requeue_session(self, row: Dict[str, Any], error: Exception):
+        """Put a row that failed on its own back on the queue, up to SESSION_WRITE_ATTEMPTS"""
+        session_id = row["session_id"]
+        attempts = self._session_write_failures.get(session_id, 0) + 1
+        if attempts >= SESSION_WRITE_ATTEMPTS:
+            self._session_write_failures.pop(session_id, None)
+            logger.error(f"Dropping beta session {session_id} after {attempts} failed writes: {error}")
+            return
+        self._session_write_failures[session_id] = attempts
+        logger.warning(f"Failed to write beta session {session_id} (attempt {attempts}), requeued: {error}")
+        self._pending_sessions.append(row)
+    
+    def _ensure_session_writer(self) -> bool:
+        """Start the background session writer; False when there is no running loop"""
+        if self._session_write_task is not None and not self._session_write_task.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._session_write_task = loop.create_task(self._write_sessions_periodically())
+        return True
+    
+    async def _write_sessions_periodically(self):
+        # Exit once idle; the next started session starts a new task
+        while self._pending_sessions:
+            await asyncio.sleep(SESSION_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self.flush_sessions)
+            except Exception:
+                # Failed rows are logged and requeued; keep draining
+                continue
+    
+    def _evict_idle_sessions(self):
+        """Make room for a new session once MAX_ACTIVE_SESSIONS is reached.
+
+        Sessions that were never ended are dropped from memory, least-used
+        first (ties go to the longest idle). A tenth of the limit is freed
+        per pass so the scan is amortized over many starts, and the
+        surviving hit counters are halved so old bursts of activity age out.
+        """
+        excess = len(self.active_sessions) - MAX_ACTIVE_SESSIONS + 1
+        if excess <= 0:
+            return
             
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Failed to start beta session: {e}")
-            raise
-        finally:
-            db.close()
+        victims = heapq.nsmallest(
+            max(excess, MAX_ACTIVE_SESSIONS // 10),
+            self.active_sessions.items(),
+            key=lambda item: (item[1]["hits"], item[1]["last_activity"])
+        )
+        for session_id, _ in victims:
+            self.active_sessions.pop(session_id)
+        self.active_sessions.decay("hits")
+        
+        logger.info(f"Evicted {len(victims)} idle beta sessions from memory")
     
     def end_beta_session(self, session_id: str):
         """End a beta testing session"""
-        if session_id not in self.active_sessions:
+        session_data = self.active_sessions.pop(session_id)
+        if session_data is None:
             logger.warning(f"Session {session_id} not found in active sessions")
             return
             
-        session_data = self.active_sessions.pop(session_id)
+        self.flush_actions()
+        # Monotonic clock for the duration so wall-clock steps can't make it negative
+        duration = time.monotonic() - session_data["start_monotonic"]
         end_time = datetime.utcnow()
-        duration = (end_time - session_data["start_time"]).total_seconds()
         
-        db = next(get_db())
         try:
-            # Update session record
-            session = db.query(BetaTestSession).filter(
-                BetaTestSession.session_id == session_id
-            ).first()
+            # The session row may still be queued or mid-write in the batch
+            # writer; flushing waits for the in-flight batch and writes the rest
+            self.flush_sessions()
             
-            if session:
-                session.end_time = end_time
-                session.duration = duration
-                session.pages_visited = session_data["pages"]
-                session.actions_performed = session_data["actions"]
-                session.errors_encountered = session_data["errors"]
-                
-                # Update user total session time
-                beta_user = db.query(BetaUser).filter(
-                    BetaUser.id == session_data["beta_user_id"]
+            with session_scope() as db:
+                # Update session record
+                session = db.query(BetaTestSession).filter(
+                    BetaTestSession.session_id == session_id
                 ).first()
-                if beta_user:
-                    beta_user.total_session_time += duration
+                
+                if session:
+                    session.end_time = end_time
+                    session.duration = duration
+                    session.pages_visited = session_data["pages"]
+                    session.actions_performed = session_data["actions"]
+                    session.errors_encountered = session_data["errors"]
                     
-                db.commit()
+            if session is None:
+                # Its INSERT failed and is waiting for a retry (or was dropped);
+                # the user's time is still credited below
+                logger.warning(f"Beta session {session_id} row not written yet; its end data is not recorded")
                 
-                logger.info(f"Ended beta session {session_id}, duration: {duration:.2f}s")
+            # The user's running total is written behind, batched across users
+            self._add_user_time(session_data["beta_user_id"], duration)
+            self.invalidate_metrics_cache()
+            logger.info(f"Ended beta session {session_id}, duration: {duration:.2f}s")
                 
         except Exception as e:
-            db.rollback()
             logger.error(f"Failed to end beta session: {e}")
-        finally:
-            db.close()
+    
+    def _add_user_time(self, beta_user_id: int, duration: float):
+        with self._user_time_lock:
+            self._pending_user_time[beta_user_id] += duration
+        if not self._ensure_user_time_writer():
+            self.flush_user_time()
+    
+    def flush_user_time(self) -> int:
+        """Add buffered session time to beta_users in one executemany; returns users updated.
+
+        A failed write is logged and the deltas are kept for the next flush
+        rather than raised, since read paths flush first and can serve
+        slightly stale totals.
+        """
+        with self._user_time_lock:
+            if not self._pending_user_time:
+                return 0
+            pending, self._pending_user_time = self._pending_user_time, defaultdict(float)
+            
+        users = BetaUser.__table__
+        try:
+            with session_scope() as db:
+                db.execute(
+                    update(users).where(users.c.id == bindparam("b_id")).values(
+                        total_session_time=users.c.total_session_time + bindparam("b_delta")
+                    ),
+                    [{"b_id": user_id, "b_delta": delta} for user_id, delta in pending.items()]
+                )
+                
+        except Exception as e:
+            logger.error(f"Failed to update session time for {len(pending)} beta users: {e}")
+            # Keep the deltas for the next flush
+            with self._user_time_lock:
+                for user_id, delta in pending.items():
+                    self._pending_user_time[user_id] += delta
+            return 0
+            
+        return len(pending)
+    
+    def _ensure_user_time_writer(self) -> bool:
+        """Start the write-behind task; False when there is no running loop"""
+        if self._user_time_task is not None and not self._user_time_task.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._user_time_task = loop.create_task(self._write_user_time_periodically())
+        return True
+    
+    async def _write_user_time_periodically(self):
+        # Sleep first: the task may be started just before the first delta
+        while True:
+            await asyncio.sleep(USER_TIME_FLUSH_INTERVAL)
+            if not self._pending_user_time:
+                return
+            # Failures are logged and the deltas requeued by flush_user_time
+            await asyncio.to_thread(self.flush_user_time)
     
     def track_user_action(self, session_id: str, action: str, context: Dict[str, Any]):
-        """Track user action during beta session"""
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id]["actions"] += 1
+        """Track user action during beta session.
+
+        The per-session counters are updated immediately; the event itself
+        is buffered and handed to the metrics collector in batches.
+        """
+        with self.active_sessions.lock_for(session_id):
+            session = self.active_sessions.get(session_id)
+            if session is None:
+                return
+                
+            session["actions"] += 1
+            session["hits"] += 1
+            session["last_activity"] = time.monotonic()
             
             # Track specific action types
             if action == "page_visit":
-                self.active_sessions[session_id]["pages"] += 1
+                session["pages"] += 1
             elif action == "error":
-                self.active_sessions[session_id]["errors"] += 1
+                session["errors"] += 1
                 
-            # Store in metrics collector
-            self.metrics_collector.record_event(
-                "beta_user_action",
-                {
-                    "session_id": session_id,
-                    "action": action,
-                    "context": context,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            )
+        self._pending_actions.append((session_id, action, context, time.time()))
+        if len(self._pending_actions) >= ACTION_FLUSH_SIZE:
+            self.flush_actions()
+        else:
+            self._ensure_action_flusher()
+    
+    def flush_actions(self) -> int:
+        """Move buffered actions into the metrics collector; returns the count"""
+        pending = self._pending_actions
+        batch = []
+        while True:
+            try:
+                session_id, action, context, timestamp = pending.popleft()
+            except IndexError:
+                break
+            batch.append({
+                "session_id": session_id,
+                "action": action,
+                "context": context,
+                "timestamp": datetime.utcfromtimestamp(timestamp).isoformat()
+            })
+            
+        if batch:
+            self.metrics_collector.record_events("beta_user_action", batch)
+        return len(batch)
+    
+    def flush_pending(self):
+        """Write everything buffered in memory (used on shutdown).
+
+        Each buffer is flushed independently so one failing write does not
+        strand the others.
+        """
+        for buffer, flush in (("actions", self.flush_actions), ("sessions", self.flush_sessions),
+                              ("session time", self.flush_user_time)):
+            try:
+                flush()
+            except Exception as e:
+                logger.error(f"Failed to flush pending beta {buffer}: {e}")
+    
+    def _ensure_action_flusher(self):
+        """Start the periodic flush when called from a running event loop"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (scripts, worker threads): the size threshold and
+            # end_beta_session still flush
+            return
+        self._flush_task = loop.create_task(self._flush_actions_periodically())
+    
+    async def _flush_actions_periodically(self):
+        # Exit once idle; the next tracked action starts a new task
+        while self._pending_actions:
+            await asyncio.sleep(ACTION_FLUSH_INTERVAL)
+            self.flush_actions()
+    
+    @staticmethod
+    def _feedback_row(beta_user_id: int, feedback_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a feedback payload into a beta_feedback row"""
+        return {
+            "beta_user_id": beta_user_id,
+            "feedback_type": _enum_member(_FEEDBACK_TYPE_MAP, feedback_data["feedback_type"]),
+            "severity": _enum_member(_SEVERITY_MAP, feedback_data["severity"]),
+            "title": feedback_data["title"],
+            "description": feedback_data["description"],
+            "feature_area": feedback_data.get("feature_area"),
+            "user_agent": feedback_data.get("user_agent"),
+            "url": feedback_data.get("url"),
+            "screenshot_url": feedback_data.get("screenshot_url"),
+            "reproduction_steps": feedback_data.get("reproduction_steps")
+        }
     
     def submit_feedback(self, beta_user_id: int, feedback_data: Dict[str, Any]) -> int:
         """Submit feedback from beta user"""
-        db = next(get_db())
-        try:
-            feedback = BetaFeedback(
-                beta_user_id=beta_user_id,
-                feedback_type=FeedbackType(feedback_data["feedback_type"]),
-                severity=BetaTestSeverity(feedback_data["severity"]),
-                title=feedback_data["title"],
-                description=feedback_data["description"],
-                feature_area=feedback_data.get("feature_area"),
-                user_agent=feedback_data.get("user_agent"),
-                url=feedback_data.get("url"),
-                screenshot_url=feedback_data.get("screenshot_url"),
-                reproduction_steps=feedback_data.get("reproduction_steps")
-            )
-            
-            db.add(feedback)
-            db.commit()
-            
-            logger.info(f"Submitted feedback {feedback.id} from beta user {beta_user_id}")
+        return self.submit_feedback_bulk(beta_user_id, [feedback_data])[0]
+    
+    def submit_feedback_bulk(self, beta_user_id: int, feedback_items: List[Dict[str, Any]]) -> List[int]:
+        """Submit several feedback items in one INSERT; returns ids in input order"""
+        rows = [self._feedback_row(beta_user_id, item) for item in feedback_items]
+        if not rows:
+            return []
             
-            # Send notification for critical issues
-            if feedback.severity == BetaTestSeverity.CRITICAL:
-                self._send_critical_feedback_alert(feedback)
+        try:
+            with session_scope() as db:
+                # Core INSERT ... RETURNING skips ORM object construction and flush
+                feedback_ids = db.execute(
+                    insert(BetaFeedback).returning(BetaFeedback.id, sort_by_parameter_order=True),
+                    rows
+                ).scalars().all()
                 
-            return feedback.id
-            
         except Exception as e:
-            db.rollback()
             logger.error(f"Failed to submit feedback: {e}")
             raise
-        finally:
-            db.close()
+            
+        self.invalidate_metrics_cache()
+        for feedback_id, row in zip(feedback_ids, rows):
+            logger.info(f"Submitted feedback {feedback_id} from beta user {beta_user_id}")
+            
+            # Send notification for critical issues
+            if row["severity"] == BetaTestSeverity.CRITICAL:
+                _alert_executor.submit(
+                    self._send_critical_feedback_alert, feedback_id, row
+                ).add_done_callback(self._log_alert_failure)
+                
+        return list(feedback_ids)
     
     def get_beta_metrics(self, phase: Optional[BetaTestPhase] = None) -> BetaTestMetrics:
-        """Get current beta testing metrics"""
-        db = next(get_db())
-        try:
-            # Base query
-            query = db.query(BetaUser)
-            if phase:
-                query = query.filter(BetaUser.phase == phase)
+        """Get current beta testing metrics, reusing a snapshot for METRICS_CACHE_TTL"""
+        now = time.monotonic()
+        cached = self._metrics_cache.get(phase)
+        if cached is not None and now < cached[0]:
+            return cached[1]
             
-            # Calculate metrics
-            total_users = query.count()
-            active_users = query.filter(BetaUser.status == BetaUserStatus.ACTIVE).count()
+        metrics = self._compute_beta_metrics(phase)
+        self._metrics_cache[phase] = (now + METRICS_CACHE_TTL, metrics)
+        return metrics
+    
+    def invalidate_metrics_cache(self):
+        """Drop cached metrics after a write that changes them"""
+        # Every write touches both the all-phase and a per-phase snapshot
+        self._metrics_cache.clear()
+    
+    def _compute_beta_metrics(self, phase: Optional[BetaTestPhase]) -> BetaTestMetrics:
+        with session_scope() as db:
+            # One aggregate query per table instead of a COUNT per metric
+            user_query = db.query(func.count(BetaUser.id)).filter(
+                BetaUser.status == BetaUserStatus.ACTIVE
+            )
+            if phase:
+                user_query = user_query.filter(BetaUser.phase == phase)
+            active_users = user_query.scalar()
             
-            # Session metrics
-            session_query = db.query(BetaTestSession)
+            # Session metrics (AVG skips sessions that have not ended)
+            session_query = db.query(
+                func.count(BetaTestSession.id),
+                func.avg(BetaTestSession.duration)
+            ).select_from(BetaTestSession)
             if phase:
                 session_query = session_query.join(BetaUser).filter(BetaUser.phase == phase)
-                
-            total_sessions = session_query.count()
-            avg_duration = session_query.filter(
-                BetaTestSession.duration.isnot(None)
-            ).with_entities(func.avg(BetaTestSession.duration)).scalar() or 0
+            total_sessions, avg_duration = session_query.one()
+            avg_duration = avg_duration or 0
             
             # Feedback metrics
-            feedback_query = db.query(BetaFeedback)
+            is_bug = BetaFeedback.feedback_type == FeedbackType.BUG_REPORT
+            feedback_query = db.query(
+                func.count().filter(is_bug),
+                func.count().filter(and_(is_bug, BetaFeedback.status == "resolved"))
+            ).select_from(BetaFeedback)
             if phase:
                 feedback_query = feedback_query.join(BetaUser).filter(BetaUser.phase == phase)
-                
-            total_feedback = feedback_query.count()
-            bugs_reported = feedback_query.filter(
-                BetaFeedback.feedback_type == FeedbackType.BUG_REPORT
-            ).count()
-            bugs_resolved = feedback_query.filter(
-                BetaFeedback.feedback_type == FeedbackType.BUG_REPORT,
-                BetaFeedback.status == "resolved"
-            ).count()
+            bugs_reported, bugs_resolved = feedback_query.one()
             
             # System metrics from monitoring
             system_metrics = app_monitor.get_system_metrics()
@@ -366,9 +761,6 @@ class BetaTestingManager:
                 bugs_resolved=bugs_resolved,
                 features_tested=self._count_features_tested(phase)
             )
-            
-        finally:
-            db.close()
     
     def _calculate_user_satisfaction(self, phase: Optional[BetaTestPhase]) -> float:
         """Calculate user satisfaction score"""
@@ -382,105 +774,132 @@ class BetaTestingManager:
         # For now, return a placeholder
         return 25  # Placeholder
     
-    def _send_critical_feedback_alert(self, feedback: BetaFeedback):
+    def _send_critical_feedback_alert(self, feedback_id: int, feedback: Dict[str, Any]):
         """Send alert for critical feedback"""
         # This would integrate with notification system
-        logger.critical(f"Critical feedback received: {feedback.title}")
+        logger.critical(f"Critical feedback {feedback_id} received: {feedback['title']}")
+    
+    @staticmethod
+    def _log_alert_failure(future: Future):
+        # Nobody waits on the alert, so surface failures here
+        if future.exception() is not None:
+            logger.error(f"Failed to send critical feedback alert: {future.exception()}")
         
     def get_user_leaderboard(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get beta user leaderboard by activity"""
-        db = next(get_db())
-        try:
-            users = db.query(BetaUser).order_by(
+        self.flush_user_time()
+        with session_scope() as db:
+            # Count feedback in the same query rather than once per user, and
+            # select only the displayed columns instead of hydrating BetaUser
+            rows = db.query(
+                BetaUser.name,
+                BetaUser.company,
+                BetaUser.total_sessions,
+                BetaUser.total_session_time,
+                BetaUser.last_login,
+                func.count(BetaFeedback.id).label("feedback_count")
+            ).outerjoin(
+                BetaFeedback, BetaFeedback.beta_user_id == BetaUser.id
+            ).group_by(BetaUser.id).order_by(
                 BetaUser.total_sessions.desc(),
                 BetaUser.total_session_time.desc()
             ).limit(limit).all()
             
             leaderboard = []
-            for user in users:
-                feedback_count = db.query(BetaFeedback).filter(
-                    BetaFeedback.beta_user_id == user.id
-                ).count()
-                
+            for row in rows:
                 leaderboard.append({
-                    "name": user.name,
-                    "company": user.company,
-                    "total_sessions": user.total_sessions,
-                    "total_time": user.total_session_time,
-                    "feedback_count": feedback_count,
-                    "last_login": user.last_login.isoformat() if user.last_login else None
+                    "name": row.name,
+                    "company": row.company,
+                    "total_sessions": row.total_sessions,
+                    "total_time": row.total_session_time,
+                    "feedback_count": row.feedback_count,
+                    "last_login": row.last_login.isoformat() if row.last_login else None
                 })
                 
             return leaderboard
-            
-        finally:
-            db.close()
     
-    def export_beta_data(self, format: str = "json") -> str:
-        """Export beta testing data for analysis"""
-        db = next(get_db())
-        try:
-            # Get all beta data
-            users = db.query(BetaUser).all()
-            feedback = db.query(BetaFeedback).all()
-            sessions = db.query(BetaTestSession).all()
-            
-            export_data = {
-                "export_timestamp": datetime.utcnow().isoformat(),
-                "summary": {
-                    "total_users": len(users),
-                    "total_feedback": len(feedback),
-                    "total_sessions": len(sessions)
-                },
-                "users": [
-                    {
-                        "id": user.id,
-                        "name": user.name,
-                        "company": user.company,
-                        "phase": user.phase.value,
-                        "status": user.status.value,
-                        "total_sessions": user.total_sessions,
-                        "total_time": user.total_session_time,
-                        "invited_at": user.invited_at.isoformat(),
-                        "last_login": user.last_login.isoformat() if user.last_login else None
-                    }
-                    for user in users
-                ],
-                "feedback": [
-                    {
-                        "id": fb.id,
-                        "type": fb.feedback_type.value,
-                        "severity": fb.severity.value,
-                        "title": fb.title,
-                        "description": fb.description,
-                        "status": fb.status,
-                        "created_at": fb.created_at.isoformat(),
-                        "resolved_at": fb.resolved_at.isoformat() if fb.resolved_at else None
-                    }
-                    for fb in feedback
-                ],
-                "sessions": [
-                    {
-                        "id": session.id,
-                        "user_id": session.beta_user_id,
-                        "duration": session.duration,
-                        "pages_visited": session.pages_visited,
-                        "actions_performed": session.actions_performed,
-                        "errors_encountered": session.errors_encountered,
-                        "start_time": session.start_time.isoformat(),
-                        "end_time": session.end_time.isoformat() if session.end_time else None
-                    }
-                    for session in sessions
-                ]
-            }
+    async def start_beta_session_async(self, beta_user_id: int, session_data: Dict[str, Any]) -> str:
+        """Start a beta session on the loop; a full batch is written off it"""
+        session_id = self._queue_session(beta_user_id, session_data)
+        if self._session_flush_due():
+            await asyncio.to_thread(self.flush_sessions)
+        logger.info(f"Started beta session {session_id} for user {beta_user_id}")
+        return session_id
+    
+    async def start_beta_sessions_bulk_async(self, sessions_data: List[Dict[str, Any]]) -> List[str]:
+        """Start many beta sessions without blocking the event loop"""
+        return await asyncio.to_thread(self.start_beta_sessions_bulk, sessions_data)
+    
+    async def end_beta_session_async(self, session_id: str):
+        """End a beta session without blocking the event loop"""
+        # Start the write-behind task here; worker threads have no loop
+        self._ensure_user_time_writer()
+        return await asyncio.to_thread(self.end_beta_session, session_id)
+    
+    async def submit_feedback_async(self, beta_user_id: int, feedback_data: Dict[str, Any]) -> int:
+        """Submit feedback without blocking the event loop"""
+        return await asyncio.to_thread(self.submit_feedback, beta_user_id, feedback_data)
+    
+    async def submit_feedback_bulk_async(self, beta_user_id: int,
+                                         feedback_items: List[Dict[str, Any]]) -> List[int]:
+        """Submit several feedback items without blocking the event loop"""
+        return await asyncio.to_thread(self.submit_feedback_bulk, beta_user_id, feedback_items)
+    
+    async def get_beta_metrics_async(self, phase: Optional[BetaTestPhase] = None) -> BetaTestMetrics:
+        """Get beta metrics without blocking the event loop"""
+        return await asyncio.to_thread(self.get_beta_metrics, phase)
+    
+    async def get_user_leaderboard_async(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the leaderboard without blocking the event loop"""
+        return await asyncio.to_thread(self.get_user_leaderboard, limit)
+    
+    def export_beta_data(self, format: str = "ndjson") -> Iterator[bytes]:
+        """Export beta testing data for analysis as newline-delimited JSON.
+
+        The first line is a summary; every following line is one user,
+        feedback or session record tagged with ``record_type``. Rows are
+        streamed from the database in batches so memory stays bounded.
+        """
+        if format != "ndjson":
+            raise ValueError(f"Unsupported export format: {format}")
+        return self._iter_export_lines()
+    
+    def _iter_export_lines(self) -> Iterator[bytes]:
+        """Generate export lines, holding the session open while streaming"""
+        self.flush_user_time()
+        # Plain column tuples skip ORM hydration; orjson encodes the enums
+        # and datetimes itself
+        record_columns = (
+            ("user", (
+                BetaUser.id, BetaUser.name, BetaUser.company, BetaUser.phase, BetaUser.status,
+                BetaUser.total_sessions, BetaUser.total_session_time.label("total_time"),
+                BetaUser.invited_at, BetaUser.last_login
+            )),
+            ("feedback", (
+                BetaFeedback.id, BetaFeedback.feedback_type.label("type"), BetaFeedback.severity,
+                BetaFeedback.title, BetaFeedback.description, BetaFeedback.status,
+                BetaFeedback.created_at, BetaFeedback.resolved_at
+            )),
+            ("session", (
+                BetaTestSession.id, BetaTestSession.beta_user_id.label("user_id"), BetaTestSession.duration,
+                BetaTestSession.pages_visited, BetaTestSession.actions_performed,
+                BetaTestSession.errors_encountered, BetaTestSession.start_time, BetaTestSession.end_time
+            )),
+        )
+        dumps, option = orjson.dumps, orjson.OPT_APPEND_NEWLINE
+        
+        with session_scope() as db:
+            yield dumps({
+                "record_type": "summary",
+                "export_timestamp": datetime.utcnow(),
+                "total_users": db.query(func.count(BetaUser.id)).scalar(),
+                "total_feedback": db.query(func.count(BetaFeedback.id)).scalar(),
+                "total_sessions": db.query(func.count(BetaTestSession.id)).scalar()
+            }, option=option)
             
-            if format == "json":
-                return json.dumps(export_data, indent=2)
-            else:
-                raise ValueError(f"Unsupported export format: {format}")
-                
-        finally:
-            db.close()
+            for record_type, columns in record_columns:
+                for row in db.query(*columns).yield_per(EXPORT_BATCH_SIZE):
+                    yield dumps({"record_type": record_type, **row._mapping}, option=option)
 
 # Global beta testing manager
 beta_testing_manager = BetaTestingManager()
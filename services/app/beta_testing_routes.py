@@ -1,11 +1,14 @@
 """Beta testing API routes"""
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import logging
 
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
 from .auth import get_current_user
 from .beta_testing import (
     beta_testing_manager, 
@@ -75,28 +78,39 @@ class BetaMetricsResponse(BaseModel):
     bugs_resolved: int
     features_tested: int
 
+# Beta user dependencies: sync, so FastAPI runs the lookup on its threadpool,
+# and resolved once per request however many dependants ask for it
+def get_beta_user(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> BetaUser:
+    """The caller's beta user record, or 403"""
+    beta_user = db.query(BetaUser).filter(BetaUser.user_id == current_user.id).first()
+    if not beta_user:
+        raise HTTPException(
+            status_code=403,
+            detail="User is not a beta tester"
+        )
+    return beta_user
+
+def get_active_beta_user(beta_user: BetaUser = Depends(get_beta_user)) -> BetaUser:
+    """The caller's beta user record if active, or 403"""
+    if beta_user.status != BetaUserStatus.ACTIVE:
+        raise HTTPException(
+            status_code=403,
+            detail="User is not an active beta tester"
+        )
+    return beta_user
+
 # Beta Session Management
 @router.post("/session/start", response_model=BetaSessionResponse)
 async def start_beta_session(
     request: Request,
     session_request: BetaSessionRequest,
-    current_user: User = Depends(get_current_user)
+    beta_user: BetaUser = Depends(get_active_beta_user)
 ):
     """Start a new beta testing session"""
     try:
-        # Check if user is a beta user
-        db = next(get_db())
-        beta_user = db.query(BetaUser).filter(
-            BetaUser.user_id == current_user.id,
-            BetaUser.status == BetaUserStatus.ACTIVE
-        ).first()
-        
-        if not beta_user:
-            raise HTTPException(
-                status_code=403,
-                detail="User is not an active beta tester"
-            )
-        
         # Prepare session data
         session_data = {
             "user_agent": session_request.user_agent or request.headers.get("User-Agent"),
@@ -106,7 +120,7 @@ async def start_beta_session(
         }
         
         # Start session
-        session_id = beta_testing_manager.start_beta_session(beta_user.id, session_data)
+        session_id = await beta_testing_manager.start_beta_session_async(beta_user.id, session_data)
         
         return BetaSessionResponse(
             session_id=session_id,
@@ -127,7 +141,7 @@ async def end_beta_session(
 ):
     """End a beta testing session"""
     try:
-        beta_testing_manager.end_beta_session(session_id)
+        await beta_testing_manager.end_beta_session_async(session_id)
         return {"message": "Beta testing session ended successfully"}
         
     except Exception as e:
@@ -163,26 +177,13 @@ async def track_beta_action(
 @router.post("/feedback", response_model=BetaFeedbackResponse)
 async def submit_beta_feedback(
     feedback_request: BetaFeedbackRequest,
-    current_user: User = Depends(get_current_user)
+    beta_user: BetaUser = Depends(get_active_beta_user)
 ):
     """Submit beta testing feedback"""
     try:
-        # Check if user is a beta user
-        db = next(get_db())
-        beta_user = db.query(BetaUser).filter(
-            BetaUser.user_id == current_user.id,
-            BetaUser.status == BetaUserStatus.ACTIVE
-        ).first()
-        
-        if not beta_user:
-            raise HTTPException(
-                status_code=403,
-                detail="User is not an active beta tester"
-            )
-        
         # Submit feedback
         feedback_data = feedback_request.dict()
-        feedback_id = beta_testing_manager.submit_feedback(beta_user.id, feedback_data)
+        feedback_id = await beta_testing_manager.submit_feedback_async(beta_user.id, feedback_data)
         
         return BetaFeedbackResponse(
             feedback_id=feedback_id,
@@ -197,43 +198,50 @@ async def submit_beta_feedback(
         )
 
 @router.get("/feedback")
-async def get_beta_feedback(
+def get_beta_feedback(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     feedback_type: Optional[FeedbackType] = None,
     severity: Optional[BetaTestSeverity] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    beta_user: BetaUser = Depends(get_beta_user),
+    db: Session = Depends(get_db)
 ):
     """Get beta feedback (admin only for now)"""
     try:
-        db = next(get_db())
-        
-        # Check if user is a beta user
-        beta_user = db.query(BetaUser).filter(
-            BetaUser.user_id == current_user.id
-        ).first()
-        
-        if not beta_user:
-            raise HTTPException(
-                status_code=403,
-                detail="User is not a beta tester"
-            )
-        
-        # Build query
-        query = db.query(BetaFeedback).filter(
-            BetaFeedback.beta_user_id == beta_user.id
-        )
-        
+        # Build filters
+        filters = [BetaFeedback.beta_user_id == beta_user.id]
         if feedback_type:
-            query = query.filter(BetaFeedback.feedback_type == feedback_type)
+            filters.append(BetaFeedback.feedback_type == feedback_type)
         if severity:
-            query = query.filter(BetaFeedback.severity == severity)
+            filters.append(BetaFeedback.severity == severity)
         if status:
-            query = query.filter(BetaFeedback.status == status)
-        
-        # Get feedback with pagination
-        feedback = query.offset(skip).limit(limit).all()
+            filters.append(BetaFeedback.status == status)
+        
+        # Page and total in one round-trip: the window count is computed over
+        # the filtered rows before OFFSET/LIMIT apply
+        feedback = db.query(
+            BetaFeedback.id,
+            BetaFeedback.feedback_type,
+            BetaFeedback.severity,
+            BetaFeedback.title,
+            BetaFeedback.description,
+            BetaFeedback.status,
+            BetaFeedback.feature_area,
+            BetaFeedback.url,
+            BetaFeedback.created_at,
+            BetaFeedback.updated_at,
+            BetaFeedback.resolved_at,
+            func.count().over().label("total")
+        ).filter(*filters).order_by(BetaFeedback.id).offset(skip).limit(limit).all()
+        
+        if feedback:
+            total = feedback[0].total
+        elif skip:
+            # Past the last page there is no row to carry the count
+            total = db.query(func.count(BetaFeedback.id)).filter(*filters).scalar()
+        else:
+            total = 0
         
         return {
             "feedback": [
@@ -252,7 +260,7 @@ async def get_beta_feedback(
                 }
                 for fb in feedback
             ],
-            "total": query.count()
+            "total": total
         }
         
     except Exception as e:
@@ -264,14 +272,13 @@ async def get_beta_feedback(
 
 # Beta User Management
 @router.post("/register")
-async def register_beta_user(
+def register_beta_user(
     registration_request: BetaUserRegistrationRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Register as a beta user"""
     try:
-        db = next(get_db())
-        
         # Check if user is already registered
         existing_beta_user = db.query(BetaUser).filter(
             BetaUser.user_id == current_user.id
@@ -319,13 +326,12 @@ async def register_beta_user(
         )
 
 @router.post("/activate")
-async def activate_beta_user(
-    current_user: User = Depends(get_current_user)
+def activate_beta_user(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Activate beta user account"""
     try:
-        db = next(get_db())
-        
         beta_user = db.query(BetaUser).filter(
             BetaUser.user_id == current_user.id,
             BetaUser.status == BetaUserStatus.INVITED
@@ -361,24 +367,11 @@ async def activate_beta_user(
 @router.get("/metrics", response_model=BetaMetricsResponse)
 async def get_beta_metrics(
     phase: Optional[BetaTestPhase] = None,
-    current_user: User = Depends(get_current_user)
+    beta_user: BetaUser = Depends(get_beta_user)
 ):
-    """Get beta testing metrics"""
+    """Get beta testing metrics (for now, any beta user may see them)"""
     try:
-        # Check if user is a beta user (for now, allow all beta users to see metrics)
-        db = next(get_db())
-        beta_user = db.query(BetaUser).filter(
-            BetaUser.user_id == current_user.id
-        ).first()
-        
-        if not beta_user:
-            raise HTTPException(
-                status_code=403,
-                detail="User is not a beta tester"
-            )
-        
-        # Get metrics
-        metrics = beta_testing_manager.get_beta_metrics(phase)
+        metrics = await beta_testing_manager.get_beta_metrics_async(phase)
         
         return BetaMetricsResponse(
             timestamp=metrics.timestamp,
@@ -404,29 +397,17 @@ async def get_beta_metrics(
 @router.get("/leaderboard")
 async def get_beta_leaderboard(
     limit: int = Query(10, ge=1, le=50),
-    current_user: User = Depends(get_current_user)
+    beta_user: BetaUser = Depends(get_beta_user)
 ):
     """Get beta user leaderboard"""
     try:
-        # Check if user is a beta user
-        db = next(get_db())
-        beta_user = db.query(BetaUser).filter(
-            BetaUser.user_id == current_user.id
-        ).first()
+        leaderboard = await beta_testing_manager.get_user_leaderboard_async(limit)
         
-        if not beta_user:
-            raise HTTPException(
-                status_code=403,
-                detail="User is not a beta tester"
-            )
-        
-        # Get leaderboard
-        leaderboard = beta_testing_manager.get_user_leaderboard(limit)
-        
-        return {
+        # orjson encodes the timestamp itself and skips jsonable_encoder
+        return ORJSONResponse({
             "leaderboard": leaderboard,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            "timestamp": datetime.utcnow()
+        })
         
     except Exception as e:
         logger.error(f"Failed to get beta leaderboard: {e}")
@@ -436,13 +417,12 @@ async def get_beta_leaderboard(
         )
 
 @router.get("/status")
-async def get_beta_status(
-    current_user: User = Depends(get_current_user)
+def get_beta_status(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get current user's beta testing status"""
     try:
-        db = next(get_db())
-        
         beta_user = db.query(BetaUser).filter(
             BetaUser.user_id == current_user.id
         ).first()
@@ -475,29 +455,19 @@ async def get_beta_status(
 # Admin endpoints (these would need proper admin authentication in production)
 @router.get("/admin/export")
 async def export_beta_data(
-    format: str = Query("json", regex="^(json)$"),
-    current_user: User = Depends(get_current_user)
+    format: str = Query("ndjson", regex="^(ndjson)$"),
+    beta_user: BetaUser = Depends(get_beta_user)
 ):
     """Export beta testing data (admin only)"""
     try:
         # For now, allow any beta user to export (in production, would need admin check)
-        db = next(get_db())
-        beta_user = db.query(BetaUser).filter(
-            BetaUser.user_id == current_user.id
-        ).first()
-        
-        if not beta_user:
-            raise HTTPException(
-                status_code=403,
-                detail="User is not a beta tester"
-            )
-        
-        # Export data
-        export_data = beta_testing_manager.export_beta_data(format)
+        # Stream the export line by line
+        export_lines = beta_testing_manager.export_beta_data(format)
         
-        return JSONResponse(
-            content=export_data,
-            headers={"Content-Disposition": f"attachment; filename=beta_data_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"}
+        return StreamingResponse(
+            export_lines,
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f"attachment; filename=beta_data_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.ndjson"}
         )
         
     except Exception as e:
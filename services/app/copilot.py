@@ -5,34 +5,104 @@ Uses SentenceTransformer embeddings + cosine similarity.
 """
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import logging
+import os
 import re
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List
 
 import numpy as np
 try:
     from sentence_transformers import SentenceTransformer  # type: ignore
+    EMBEDDINGS_AVAILABLE = True
 except Exception:  # pragma: no cover – fall back if lib incompatibilities
+    EMBEDDINGS_AVAILABLE = False
+
     class SentenceTransformer:  # pyright: ignore
         """Very lightweight stub returning zero vectors (for CI)."""
         def __init__(self, *args, **kwargs):
             pass
-        def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        def encode(self, texts, **kwargs):
             if isinstance(texts, list):
                 return np.zeros((len(texts), 384))
             return np.zeros(384)
 
+try:
+    import torch
+except ImportError:  # pragma: no cover
+    torch = None
+
+try:
+    import faiss  # type: ignore
+except ImportError:  # pragma: no cover – exact NumPy scan is used instead
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
 DOC_DIRS = [Path("docs"), Path("README.md")]
 MODEL_NAME = "all-MiniLM-L6-v2"
+QUERY_CACHE_SIZE = 512  # distinct question embeddings kept per retriever
+ENCODE_BATCH_SIZE = 64  # paragraphs per transformer forward pass
+EMBEDDING_CACHE_DIR = Path(os.getenv("COPILOT_CACHE_DIR", "~/.cache/value_partner/copilot")).expanduser()
+MIN_CHUNK_CHARS = 50  # shorter paragraphs (headings, rules) are not indexed
+_PARA_RE = re.compile(r"\n{2,}")
+
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+    """Yield stripped paragraphs long enough to index, without building a split list"""
+    start = 0
+    for match in _PARA_RE.finditer(text):
+        para = text[start:match.start()].strip()
+        if len(para) > MIN_CHUNK_CHARS:
+            yield para
+        start = match.end()
+    para = text[start:].strip()
+    if len(para) > MIN_CHUNK_CHARS:
+        yield para
+
+
+def _chunk_key(chunk: str) -> str:
+    """Stable content hash for a paragraph (hash() is salted per process)"""
+    return hashlib.blake2b(chunk.encode(), digest_size=8).hexdigest()
+
+
+def _embedding_cache_path() -> Path:
+    return EMBEDDING_CACHE_DIR / f"{MODEL_NAME}.npz"
+
+
+def _load_embedding_cache(path: Path) -> Dict[str, np.ndarray]:
+    if not path.exists():
+        return {}
+    try:
+        with np.load(path) as data:
+            return dict(zip(data["keys"].tolist(), data["embeddings"]))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable embedding cache {path}: {e}")
+        return {}
 
 
 class CopilotRetriever:
     def __init__(self):
         self.model = SentenceTransformer(MODEL_NAME)
+        if EMBEDDINGS_AVAILABLE and torch is not None and torch.cuda.is_available():
+            # Half-precision weights halve the bytes moved through the matmuls
+            self.model = self.model.half()
         self.corpus_chunks: List[str] = []
         self.embeddings: np.ndarray | None = None
+        self.index = None  # faiss inner-product index when faiss is installed
+        # Repeated questions skip the transformer forward pass
+        self._encode_query = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._encode_query_uncached)
         self._load_corpus()
 
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize along the last axis so cosine similarity is a dot product"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / (np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-9)
+
     def _load_corpus(self):
         texts = []
         for d in DOC_DIRS:
@@ -44,16 +114,72 @@ class CopilotRetriever:
         # chunk by paragraphs
         chunks = []
         for t in texts:
-            for para in re.split(r"\n{2,}", t):
-                if len(para.strip()) > 50:
-                    chunks.append(para.strip())
+            chunks.extend(_iter_paragraphs(t))
         self.corpus_chunks = chunks
-        self.embeddings = self.model.encode(chunks, convert_to_numpy=True, show_progress_bar=False)
+        self.embeddings = self._normalize(self._encode_corpus(chunks))
+        if faiss is not None and chunks:
+            # Exact search over unit vectors, so inner product is cosine
+            self.index = faiss.IndexFlatIP(self.embeddings.shape[1])
+            self.index.add(np.ascontiguousarray(self.embeddings))
+
+    def _encode_corpus(self, chunks: List[str]) -> np.ndarray:
+        """Encode paragraphs, re-running the model only for ones not cached on disk"""
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not EMBEDDINGS_AVAILABLE:
+            # Never persist the stub's zero vectors
+            return self.model.encode(chunks, convert_to_numpy=True, show_progress_bar=False)
+
+        cache_path = _embedding_cache_path()
+        cache = _load_embedding_cache(cache_path)
+        keys = [_chunk_key(chunk) for chunk in chunks]
+        missing = {key: chunk for key, chunk in zip(keys, chunks) if key not in cache}
+        if missing:
+            encoded = self.model.encode(
+                list(missing.values()),
+                batch_size=ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            cache.update(zip(missing, encoded))
+
+        embeddings = np.stack([cache[key] for key in keys])
+        if missing:
+            # Rewrite with only the current paragraphs so edited ones drop out
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                unique_keys = list(dict.fromkeys(keys))
+                np.savez_compressed(
+                    cache_path,
+                    keys=np.array(unique_keys),
+                    embeddings=np.stack([cache[key] for key in unique_keys]).astype(np.float16)
+                )
+            except Exception as e:
+                logger.warning(f"Could not write embedding cache {cache_path}: {e}")
+        return embeddings
+
+    def _encode_query_uncached(self, q: str) -> np.ndarray:
+        q_emb = self._normalize(self.model.encode(q, convert_to_numpy=True, normalize_embeddings=True))
+        q_emb.setflags(write=False)  # shared through the cache
+        return q_emb
 
     def query(self, q: str, k: int = 3) -> List[str]:
-        q_emb = self.model.encode(q, convert_to_numpy=True)
-        sims = np.dot(self.embeddings, q_emb) / (
-            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(q_emb) + 1e-9
-        )
-        top_idx = sims.argsort()[-k:][::-1]
-        return [self.corpus_chunks[i] for i in top_idx]
\ No newline at end of file
+        k = min(k, len(self.corpus_chunks))
+        if k <= 0:
+            return []
+        q_emb = self._encode_query(q)
+        if self.index is not None:
+            _, ids = self.index.search(np.array(q_emb[None, :]), k)
+            return [self.corpus_chunks[i] for i in ids[0] if i >= 0]
+
+        # Rows are unit length, so one matrix-vector product gives the cosines
+        sims = self.embeddings @ q_emb
+        # Linear-time selection of the k best, then sort only those
+        idx = np.argpartition(sims, -k)[-k:]
+        top_idx = idx[np.argsort(sims[idx])[::-1]]
+        return [self.corpus_chunks[i] for i in top_idx]
+
+    async def query_async(self, q: str, k: int = 3) -> List[str]:
+        """Answer a query without blocking the event loop on the encoder forward pass"""
+        return await asyncio.to_thread(self.query, q, k)
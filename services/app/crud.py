@@ -1,24 +1,36 @@
+import logging
+
+from sqlalchemy import insert, inspect
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from . import database, schemas
 
+logger = logging.getLogger(__name__)
+
 def get_user_by_email(db: Session, email: str):
-    print(f"Attempting to retrieve user with email: {email}")
     user = db.query(database.User).filter(database.User.email == email).first()
-    if user:
-        print(f"User found: {user.email}")
-    else:
-        print(f"User not found for email: {email}")
+    # Lazy %-formatting: nothing is built unless DEBUG is enabled
+    logger.debug("User lookup for %s: %s", email, "found" if user else "not found")
     return user
 
 def create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
     """Creates a new user in the database."""
-    db_user = database.User(
-        email=user.email,
-        name=user.name,
-        hashed_password=hashed_password
-    )
-    db.add(db_user)
+    # INSERT ... RETURNING hands back the whole row, server defaults included,
+    # as a session-attached User in one round-trip
+    db_user = db.scalars(
+        insert(database.User).values(
+            email=user.email,
+            name=user.name,
+            hashed_password=hashed_password
+        ).returning(database.User)
+    ).one()
+    row = {attr.key: getattr(db_user, attr.key) for attr in inspect(database.User).column_attrs}
     db.commit()
-    db.refresh(db_user)
+    # The commit expires the instance; restore the column values RETURNING
+    # already fetched so reading them does not re-select the row (relationships
+    # still lazy-load). Only this instance is touched, the session's
+    # expire-on-commit behaviour is left alone
+    for key, value in row.items():
+        set_committed_value(db_user, key, value)
     return db_user
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum, Numeric
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum, Numeric, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.sql import func, expression
+from contextlib import contextmanager
 from datetime import datetime
 import enum
 import os
@@ -22,6 +23,9 @@ ENGINE_ARGS: dict = {}
 # Allow SQLite connections across threads (FastAPI tests spawn workers)
 if DATABASE_URL.startswith("sqlite"):
     ENGINE_ARGS["connect_args"] = {"check_same_thread": False}
+else:
+    # Keep warm connections for request bursts and drop ones the server closed
+    ENGINE_ARGS.update(pool_size=10, max_overflow=20, pool_pre_ping=True, pool_recycle=3600)
 
 # Lazily create engine so we can inspect URL afterwards
 engine = create_engine(DATABASE_URL, **ENGINE_ARGS)
@@ -135,6 +139,10 @@ class Portfolio(Base):
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (
+        # Analytics filters every holdings join on (user_id, account_type)
+        Index("ix_accounts_user_id_account_type", "user_id", "account_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -299,5 +307,22 @@ def get_db():
     finally:
         db.close()
 
+@contextmanager
+def session_scope():
+    """Transactional session for code outside FastAPI dependency injection.
+
+    Commits on success, rolls back on error and always returns the
+    connection to the pool.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 def init_db():
     Base.metadata.create_all(bind=engine)
\ No newline at end of file
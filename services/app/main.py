@@ -2,8 +2,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+import asyncio
 import uuid
 from fastapi import FastAPI, HTTPException, status, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from .license import LicenseMiddleware
 import os
@@ -25,6 +27,7 @@ from .unified_account_routes import router as unified_account_router
 from .monitoring_routes import router as monitoring_router
 from .websocket_routes import router as websocket_router
 from .beta_testing_routes import router as beta_router
+from .beta_testing import beta_testing_manager
 from .database import init_db
 from celery import current_app as current_celery_app
 from pathlib import Path
@@ -58,6 +61,8 @@ app = FastAPI(
     title="Value Investing AI API",
     version="0.1.0",
     description="REST endpoints for the institutional-grade value-investing platform.",
+    # orjson renders every JSON body; FastAPI still runs jsonable_encoder first
+    default_response_class=ORJSONResponse,
     on_startup=[],
     on_shutdown=[]
 )
@@ -185,6 +190,12 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Error enqueueing test Celery task: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist in-memory write-behind buffers before the process exits"""
+    await asyncio.to_thread(beta_testing_manager.flush_pending)
+    logger.info("Beta testing buffers flushed")
+
 # Add health check endpoint with comprehensive service status
 @app.get("/health", include_in_schema=False)
 async def health_check():
@@ -340,7 +351,7 @@ app.include_router(beta_router)
 async def copilot_query(req: QueryRequest):
     if retriever is None:
         raise HTTPException(status_code=503, detail="Copilot not available")
-    answers = retriever.query(req.question)
+    answers = await retriever.query_async(req.question)
     return QueryResponse(answers=answers)
 
 
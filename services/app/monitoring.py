@@ -61,6 +61,7 @@ class MetricsCollector:
         self.gauges = {}
         self.histograms = defaultdict(list)
         self.timers = defaultdict(list)
+        self.events = defaultdict(lambda: deque(maxlen=max_metrics))
         self.lock = Lock()
     
     def increment(self, name: str, value: float = 1.0, tags: Dict[str, str] = None):
@@ -97,6 +98,17 @@ class MetricsCollector:
                 self.timers[key] = self.timers[key][-1000:]
             self._add_metric(name, value, MetricType.TIMER, tags)
     
+    def record_events(self, name: str, events: List[Dict[str, Any]]):
+        """Store a batch of structured events under a single lock acquisition"""
+        with self.lock:
+            self.events[name].extend(events)
+            self.counters[name] += len(events)
+    
+    def get_events(self, name: str) -> List[Dict[str, Any]]:
+        """Get the retained events recorded under a name"""
+        with self.lock:
+            return list(self.events.get(name, ()))
+    
     def get_metrics(self, since: Optional[datetime] = None) -> List[Metric]:
         """Get metrics since a specific time"""
         with self.lock:
@@ -1,10 +1,14 @@
+import asyncio
+import json
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from .database import get_db
+from .integrations import get_alpaca_service
 from .order_management import (
     OrderManagementSystem, 
     OrderRequest, 
@@ -130,7 +134,8 @@ async def submit_order(
     oms = OrderManagementSystem(db)
     
     try:
-        success = oms.submit_order(order_id)
+        # Broker round-trip is blocking; keep it off the event loop
+        success = await asyncio.to_thread(oms.submit_order, order_id)
         
         if success:
             # Schedule status update in background
@@ -153,7 +158,7 @@ async def cancel_order(
     oms = OrderManagementSystem(db)
     
     try:
-        success = oms.cancel_order(order_id)
+        success = await asyncio.to_thread(oms.cancel_order, order_id)
         
         if success:
             return {"message": "Order cancelled successfully", "order_id": order_id}
@@ -292,7 +297,7 @@ async def get_order_status(
     """Get current order status"""
     
     oms = OrderManagementSystem(db)
-    order = oms.update_order_status(order_id)
+    order = await asyncio.to_thread(oms.update_order_status, order_id)
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -316,6 +321,32 @@ async def get_order_status(
     )
 
 
+def _ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON"""
+    for row in rows:
+        yield json.dumps(row).encode() + b"\n"
+
+
+@router.get("/broker/stream")
+async def stream_broker_orders(
+    status: Optional[str] = None,
+    limit: int = 500,
+    after: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    direction: str = "desc"
+):
+    """Stream broker orders as NDJSON, one order per line"""
+    
+    orders = get_alpaca_service().iter_orders(
+        status=status,
+        limit=limit,
+        after=after,
+        until=until,
+        direction=direction
+    )
+    return StreamingResponse(_ndjson(orders), media_type="application/x-ndjson")
+
+
 @router.post("/sync/{user_id}")
 async def sync_user_orders(
     user_id: int,
@@ -427,7 +458,7 @@ async def create_and_submit_order(
         )
         
         # Submit order
-        success = oms.submit_order(order.id)
+        success = await asyncio.to_thread(oms.submit_order, order.id)
         
         if success:
             # Schedule status update in background
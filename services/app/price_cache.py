@@ -0,0 +1,147 @@
+"""Process-wide TTL cache for daily close prices fetched from yfinance"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+PRICE_CACHE_TTL = 3600.0  # seconds
+PRICE_CACHE_MAXSIZE = 4096
+FALLBACK_MAX_WORKERS = 16
+# Both fetch paths return split- and dividend-adjusted closes, so cached
+# series are comparable whichever path filled them
+AUTO_ADJUST = True
+
+# (symbol, start, end) -> (fetched_at, close series)
+_CacheKey = Tuple[str, date, date]
+_cache: Dict[_CacheKey, Tuple[float, pd.Series]] = {}
+_lock = threading.Lock()
+
+
+def _as_date(value: Union[date, datetime]) -> date:
+    """Normalize to a calendar date so intra-day requeries share entries"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _download_close_prices(symbols: Iterable[str], start_date: date, end_date: date) -> Dict[str, pd.Series]:
+    """Fetch daily closes for several symbols in one batched yfinance request"""
+
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+
+    raw = yf.download(
+        tickers=symbols,
+        start=start_date,
+        end=end_date + timedelta(days=1),
+        group_by='ticker',
+        threads=True,
+        progress=False,
+        auto_adjust=AUTO_ADJUST
+    )
+    if raw is None or raw.empty:
+        return {}
+
+    # A single ticker comes back without the per-ticker column level
+    if not isinstance(raw.columns, pd.MultiIndex):
+        close = raw['Close'].dropna()
+        return {symbols[0]: close} if not close.empty else {}
+
+    price_data = {}
+    available = set(raw.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        close = raw[symbol]['Close'].dropna()
+        if not close.empty:
+            price_data[symbol] = close
+    return price_data
+
+
+def _fetch_symbol_close(symbol: str, start_date: date, end_date: date) -> Optional[pd.Series]:
+    """Fetch one symbol's closes via Ticker.history (fallback path)"""
+    try:
+        hist = yf.Ticker(symbol).history(
+            start=start_date, end=end_date + timedelta(days=1), auto_adjust=AUTO_ADJUST
+        )
+    except Exception as e:
+        logger.warning(f"Error fetching data for {symbol}: {e}")
+        return None
+    if hist is None or hist.empty:
+        return None
+    close = hist['Close'].dropna()
+    # Ticker.history is exchange-localized; match yf.download's naive index
+    if getattr(close.index, "tz", None) is not None:
+        close.index = close.index.tz_localize(None)
+    return close if not close.empty else None
+
+
+def _fetch_close_prices_parallel(symbols: List[str], start_date: date, end_date: date) -> Dict[str, pd.Series]:
+    """Fetch symbols individually on a thread pool; yfinance releases the GIL on I/O"""
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(FALLBACK_MAX_WORKERS, len(symbols))) as executor:
+        closes = executor.map(lambda symbol: _fetch_symbol_close(symbol, start_date, end_date), symbols)
+        return {symbol: close for symbol, close in zip(symbols, closes) if close is not None}
+
+
+def _evict(now: float) -> None:
+    """Drop expired entries, then the oldest ones, until under the size cap"""
+    if len(_cache) <= PRICE_CACHE_MAXSIZE:
+        return
+    for key in [k for k, (fetched_at, _) in _cache.items() if now - fetched_at >= PRICE_CACHE_TTL]:
+        del _cache[key]
+    while len(_cache) > PRICE_CACHE_MAXSIZE:
+        del _cache[next(iter(_cache))]
+
+
+def get_close_prices(symbols: Iterable[str], start_date: Union[date, datetime],
+                     end_date: Union[date, datetime]) -> Dict[str, pd.Series]:
+    """Return daily closes per symbol, downloading only the uncached ones.
+
+    The returned series are shared between callers and must not be mutated.
+    """
+
+    start, end = _as_date(start_date), _as_date(end_date)
+    now = time.monotonic()
+
+    price_data: Dict[str, pd.Series] = {}
+    missing: List[str] = []
+    with _lock:
+        for symbol in dict.fromkeys(symbols):
+            entry = _cache.get((symbol, start, end))
+            if entry is not None and now - entry[0] < PRICE_CACHE_TTL:
+                price_data[symbol] = entry[1]
+            else:
+                missing.append(symbol)
+
+    if missing:
+        try:
+            fetched = _download_close_prices(missing, start, end)
+        except Exception as e:
+            logger.warning(f"Batched price download failed for {missing}: {e}")
+            fetched = {}
+        # yf.download silently drops tickers it could not fetch; retry those
+        # one by one in parallel
+        leftover = [symbol for symbol in missing if symbol not in fetched]
+        if leftover:
+            fetched.update(_fetch_close_prices_parallel(leftover, start, end))
+        with _lock:
+            for symbol, close in fetched.items():
+                _cache[(symbol, start, end)] = (now, close)
+            _evict(now)
+        price_data.update(fetched)
+
+    return price_data
+
+
+def clear_price_cache() -> None:
+    """Empty the cache (used by tests and after data corrections)"""
+    with _lock:
+        _cache.clear()
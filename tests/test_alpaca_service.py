@@ -2,7 +2,15 @@ import pytest
 import os
 from unittest.mock import Mock, patch, MagicMock
 from decimal import Decimal
-from services.app.alpaca_service import AlpacaService, execute_trade
+from services.app.alpaca_service import AlpacaService, execute_trade, get_alpaca_settings
+from services.app.integrations import set_alpaca_service
+
+@pytest.fixture(autouse=True)
+def reload_alpaca_settings():
+    """Re-read Alpaca settings from each test's patched environment"""
+    get_alpaca_settings.cache_clear()
+    yield
+    get_alpaca_settings.cache_clear()
 
 @pytest.fixture
 def mock_alpaca_api():
@@ -141,6 +149,18 @@ class TestAlpacaService:
         assert result[0]["side"] == "long"
         assert result[0]["market_value"] == 15000.00
     
+    def test_get_positions_cached(self, alpaca_service, mock_alpaca_api):
+        """Test positions are served from cache until invalidated"""
+        mock_alpaca_api.list_positions.return_value = []
+        
+        alpaca_service.get_positions()
+        alpaca_service.get_positions()
+        assert mock_alpaca_api.list_positions.call_count == 1
+        
+        alpaca_service.cancel_order("test_order_id")
+        alpaca_service.get_positions()
+        assert mock_alpaca_api.list_positions.call_count == 2
+    
     def test_get_positions_no_api(self):
         """Test positions retrieval with no API"""
         service = AlpacaService()
@@ -272,8 +292,63 @@ class TestAlpacaService:
         result = service.cancel_order("test_order_id")
         assert result is False
 
+    def test_get_orders_success(self, alpaca_service, mock_alpaca_api):
+        """Test orders listing converts each order once"""
+        mock_order = Mock()
+        mock_order.id = "test_order_id"
+        mock_order.client_order_id = "client_123"
+        mock_order.symbol = "AAPL"
+        mock_order.qty = "10"
+        mock_order.side = "buy"
+        mock_order.order_type = "limit"
+        mock_order.time_in_force = "day"
+        mock_order.limit_price = "150.00"
+        mock_order.stop_price = None
+        mock_order.status = "new"
+        mock_order.created_at = None
+        mock_order.updated_at = None
+        mock_order.submitted_at = None
+        mock_order.filled_at = None
+        mock_order.filled_qty = None
+        mock_order.filled_avg_price = None
+        mock_order.commission = None
+        mock_order.extended_hours = False
+        
+        mock_alpaca_api.list_orders.return_value = [mock_order, mock_order]
+        
+        result = alpaca_service.get_orders(status="open")
+        
+        assert len(result) == 2
+        assert result[0]["id"] == "test_order_id"
+        assert result[0]["qty"] == 10.0
+        assert result[0]["limit_price"] == 150.00
+        assert result[0]["stop_price"] is None
+        mock_alpaca_api.list_orders.assert_called_once()
+    
+    def test_get_orders_failure(self, alpaca_service, mock_alpaca_api):
+        """Test orders listing failure"""
+        mock_alpaca_api.list_orders.side_effect = Exception("List failed")
+        
+        result = alpaca_service.get_orders()
+        assert result == []
+    
+    def test_get_orders_no_api(self):
+        """Test orders listing with no API"""
+        service = AlpacaService()
+        service.api = None
+        
+        result = service.get_orders()
+        assert result == []
+
 class TestExecuteTradeFunction:
     
+    @pytest.fixture(autouse=True)
+    def reset_alpaca_singleton(self):
+        """Rebuild the shared AlpacaService from each test's environment"""
+        set_alpaca_service(None)
+        yield
+        set_alpaca_service(None)
+    
     def test_execute_trade_connected(self, mock_alpaca_api):
         """Test execute_trade function with connected service"""
         with patch.dict(os.environ, {
@@ -317,10 +392,11 @@ class TestExecuteTradeFunction:
             mock_order.extended_hours = False
             
             mock_alpaca_api.submit_order.return_value = mock_order
-            mock_alpaca_api.get_account.return_value = Mock()
             
             result = execute_trade("AAPL", 100, "buy")
             
+            mock_alpaca_api.get_account.assert_not_called()
+            
             assert result["symbol"] == "AAPL"
             assert result["quantity"] == 100
             assert result["action"] == "buy"
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from services.app.analytics import PortfolioAnalytics, _max_drawdown, _max_drawdown_numpy
+
+
+@pytest.fixture
+def analytics():
+    return PortfolioAnalytics(db=None)
+
+
+def test_daily_portfolio_values_positions_times_prices(analytics):
+    """Daily value is cumulative shares times the last known close"""
+    transactions = pd.DataFrame([
+        {"date": datetime(2024, 1, 1), "symbol": "AAPL", "quantity": 10, "amount": 1000},
+        {"date": datetime(2024, 1, 3), "symbol": "AAPL", "quantity": -5, "amount": -500},
+        {"date": datetime(2024, 1, 2), "symbol": "MSFT", "quantity": 2, "amount": 400},
+    ])
+    prices = {
+        "AAPL": pd.Series([100.0, 110.0], index=pd.to_datetime(["2024-01-01", "2024-01-03"])),
+        "MSFT": pd.Series([200.0], index=pd.to_datetime(["2024-01-02"])),
+    }
+
+    with patch("services.app.analytics.get_close_prices", return_value=prices):
+        result = analytics._calculate_daily_portfolio_values(
+            transactions, datetime(2024, 1, 1), datetime(2024, 1, 4)
+        )
+
+    # Jan 1: 10*100; Jan 2: 10*100 + 2*200; Jan 3/4: 5*110 + 2*200
+    assert result["portfolio_value"].tolist() == [1000.0, 1400.0, 950.0, 950.0]
+    assert pd.isna(result["daily_return"].iloc[0])
+    assert result["daily_return"].iloc[1] == pytest.approx(0.4)
+
+
+def test_daily_portfolio_values_without_prices(analytics):
+    """No price data yields an empty frame"""
+    transactions = pd.DataFrame([
+        {"date": datetime(2024, 1, 1), "symbol": "AAPL", "quantity": 10, "amount": 1000},
+    ])
+
+    with patch("services.app.analytics.get_close_prices", return_value={}):
+        result = analytics._calculate_daily_portfolio_values(
+            transactions, datetime(2024, 1, 1), datetime(2024, 1, 2)
+        )
+
+    assert result.empty
+
+
+def test_max_drawdown_kernels_agree():
+    """The compiled (or fallback) kernel matches the vectorized reference"""
+    returns = np.array([0.10, -0.20, 0.05, -0.10, 0.30])
+
+    assert _max_drawdown(returns) == pytest.approx(_max_drawdown_numpy(returns))
+    assert _max_drawdown_numpy(returns) == pytest.approx(1.1 * 0.8 * 1.05 * 0.9 / 1.1 - 1)
+
+    # An opening loss sets the first peak rather than counting as a drawdown
+    opens_down = np.array([-0.1, 0.05, -0.02, 0.03])
+    assert _max_drawdown(opens_down) == pytest.approx(_max_drawdown_numpy(opens_down))
+    assert _max_drawdown_numpy(opens_down) == pytest.approx(-0.02)
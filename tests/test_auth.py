@@ -147,6 +147,17 @@ class TestTokenVerification:
             payload = verify_token(token)
             assert payload is None
 
+    def test_verify_token_cached(self):
+        """Test repeated verification of the same token skips decoding"""
+        token = create_access_token({"sub": "cacheduser"})
+        
+        assert verify_token(token)["sub"] == "cacheduser"
+        with patch("services.app.auth.jwt.decode") as mock_decode:
+            payload = verify_token(token)
+        
+        assert payload["sub"] == "cacheduser"
+        mock_decode.assert_not_called()
+
 class TestUserAuthentication:
     
     @pytest.fixture
@@ -307,4 +318,23 @@ class TestTokenEdgeCases:
         
         assert payload["sub"] == "testuser"
         assert len(payload["large_data"]) == 1000
-        assert len(payload["permissions"]) == 100
\ No newline at end of file
+        assert len(payload["permissions"]) == 100
+
+class TestCreateUser:
+    
+    def test_created_user_loaded_after_commit(self, test_db_session):
+        """The RETURNING columns survive the commit without changing session-wide expiry"""
+        from sqlalchemy import inspect
+        from services.app import crud, database, schemas
+        
+        user_in = schemas.UserCreate(email="new@example.com", password="testpassword", name="New User")
+        user = crud.create_user(test_db_session, user=user_in, hashed_password="hashed")
+        
+        # Relationships stay expired and lazy-load as usual; only the
+        # column values are restored
+        columns = {attr.key for attr in inspect(database.User).column_attrs}
+        state = inspect(user)
+        assert state.persistent and not state.expired_attributes & columns
+        assert (user.email, user.hashed_password) == ("new@example.com", "hashed")
+        assert user.created_at is not None
+        assert test_db_session.expire_on_commit is True
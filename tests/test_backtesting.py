@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from services.app import backtesting
+from services.app.backtesting import PortfolioBacktester
+
+
+@pytest.fixture
+def backtester(tmp_path, monkeypatch):
+    monkeypatch.setattr(backtesting, "PRICE_DISK_CACHE_DIR", tmp_path)
+    return PortfolioBacktester(db=None)
+
+
+def _prices(symbols, periods=5):
+    index = pd.date_range("2024-01-01", periods=periods, freq="B")
+    return pd.DataFrame({symbol: [100.0 + i for i in range(periods)] for symbol in symbols}, index=index)
+
+
+def test_download_price_data_uses_disk_cache(backtester):
+    """A repeated closed-range download is served from the parquet cache"""
+    start, end = datetime(2024, 1, 1), datetime(2024, 1, 8)
+    with patch.object(backtester, "_fetch_price_data", return_value=_prices(["AAPL", "SPY"])) as mock_fetch:
+        first = backtester._download_price_data(["AAPL", "SPY"], start, end)
+        second = backtester._download_price_data(["SPY", "AAPL"], start, end)
+        backtester._download_price_data(["AAPL", "SPY"], start, end, refresh=True)
+
+    assert list(second.columns) == ["SPY", "AAPL"]
+    pd.testing.assert_frame_equal(second[["AAPL", "SPY"]], first, check_freq=False)
+    assert mock_fetch.call_count == 2
+
+
+def test_backtest_allocation_values_track_shares(backtester):
+    """Portfolio value is shares times price, with trades settled in cash"""
+    index = pd.date_range("2024-01-01", periods=4, freq="B")
+    price_data = pd.DataFrame({
+        "AAA": [100.0, 100.0, 110.0, 121.0],
+        "BBB": [50.0, 50.0, 50.0, 25.0],
+        "SPY": [400.0, 400.0, 404.0, 408.0],
+    }, index=index)
+    config = backtesting.BacktestConfig(
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 4),
+        initial_capital=1000.0,
+        rebalancing_frequency=backtesting.RebalancingFrequency.ANNUAL,
+        rebalancing_threshold=1.0,
+        transaction_cost=0.001,
+    )
+
+    result = backtester.backtest_allocation({"AAA": 0.5, "BBB": 0.5}, config, price_data=price_data)
+
+    # Day 1 buys 5 AAA and 10 BBB for 1000 and pays 1 in costs
+    assert result.portfolio_values.tolist() == pytest.approx([999.0, 1049.0, 854.0])
+    assert result.transaction_costs.tolist() == pytest.approx([1.0, 0.0, 0.0])
+    assert result.weights_history["AAA"].iloc[1] == pytest.approx(550.0 / 1049.0)
+    assert result.max_drawdown == pytest.approx(854.0 / 1049.0 - 1.0)
+
+
+def test_backtest_allocation_rebalances_on_drift(backtester):
+    """Drift past the threshold triggers a rebalance on that bar"""
+    index = pd.date_range("2024-01-01", periods=4, freq="B")
+    price_data = pd.DataFrame({
+        "AAA": [100.0, 100.0, 110.0, 121.0],
+        "BBB": [50.0, 50.0, 50.0, 25.0],
+        "SPY": [400.0, 400.0, 404.0, 408.0],
+    }, index=index)
+    config = backtesting.BacktestConfig(
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 4),
+        initial_capital=1000.0,
+        rebalancing_frequency=backtesting.RebalancingFrequency.ANNUAL,
+        rebalancing_threshold=0.05,
+        transaction_cost=0.001,
+    )
+
+    result = backtester.backtest_allocation({"AAA": 0.5, "BBB": 0.5}, config, price_data=price_data)
+
+    # Day 3: AAA is 605 of 854; moving 178 into BBB costs 0.355
+    assert result.transaction_costs.tolist() == pytest.approx([1.0, 0.0, 0.355])
+    assert result.portfolio_values.iloc[-1] == pytest.approx(853.645)
+    assert result.weights_history.iloc[-1].tolist() == pytest.approx([427.0 / 853.645, 427.0 / 853.645])
+
+
+def test_return_stats_kernels_agree():
+    """The fused single-pass statistics match the NumPy reference"""
+    rng = np.random.default_rng(7)
+    p = rng.normal(0.0005, 0.01, 500)
+    b = rng.normal(0.0004, 0.009, 500)
+
+    assert backtesting._return_stats(p, b) == pytest.approx(backtesting._return_stats_numpy(p, b))
+
+    # Constant returns have no volatility; running sums of squares would
+    # leave a residue that passes the volatility > 0 guard
+    flat = np.full(500, 0.0012)
+    stats = backtesting._return_stats(flat, b)
+    assert stats == pytest.approx(backtesting._return_stats_numpy(flat, b), abs=1e-15)
+    assert stats[0] < 1e-15
+
+
+def test_batched_monte_carlo_compounds_mean_without_noise():
+    """With zero loadings every float32 path compounds the portfolio mean"""
+    final_values = backtesting._simulate_final_values_batched(np.zeros(2), 0.001, 10, 5, 100.0)
+
+    assert final_values.dtype == np.float64
+    assert final_values == pytest.approx(np.full(5, 100.0 * 1.001 ** 10), rel=1e-5)
+
+
+def test_partial_download_not_cached(backtester):
+    """A download missing a symbol is refetched next time instead of cached"""
+    start, end = datetime(2024, 1, 1), datetime(2024, 1, 8)
+    with patch.object(backtester, "_fetch_price_data", return_value=_prices(["SPY"])) as mock_fetch:
+        backtester._download_price_data(["AAPL", "SPY"], start, end)
+        backtester._download_price_data(["AAPL", "SPY"], start, end)
+
+    assert mock_fetch.call_count == 2
+    assert not any(backtesting.PRICE_DISK_CACHE_DIR.iterdir())
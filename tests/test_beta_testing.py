@@ -0,0 +1,327 @@
+import json
+import pytest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+from services.app import beta_testing
+from services.app.beta_testing import (
+    BetaFeedback,
+    BetaTestingManager,
+    BetaTestPhase,
+    BetaTestSession,
+    BetaUser,
+    BetaUserStatus,
+    FeedbackType,
+    BetaTestSeverity,
+)
+
+
+@pytest.fixture
+def manager(test_db_session, monkeypatch):
+    """Manager whose sessions run inside the isolated test transaction"""
+
+    @contextmanager
+    def scope():
+        yield test_db_session
+        test_db_session.flush()
+
+    monkeypatch.setattr(beta_testing, "session_scope", scope)
+    monitor = MagicMock()
+    monitor.get_system_metrics.return_value = {}
+    monkeypatch.setattr(beta_testing, "app_monitor", monitor)
+    return BetaTestingManager()
+
+
+@pytest.fixture
+def beta_users(test_db_session):
+    users = [
+        BetaUser(user_id=1, email="a@example.com", name="Alice", phase=BetaTestPhase.INTERNAL,
+                 status=BetaUserStatus.ACTIVE, total_sessions=5, total_session_time=100.0),
+        BetaUser(user_id=2, email="b@example.com", name="Bob", phase=BetaTestPhase.CLOSED,
+                 status=BetaUserStatus.INVITED, total_sessions=2, total_session_time=50.0),
+    ]
+    test_db_session.add_all(users)
+    test_db_session.flush()
+    return users
+
+
+def _feedback(beta_user, feedback_type=FeedbackType.BUG_REPORT, status="open"):
+    return BetaFeedback(beta_user_id=beta_user.id, feedback_type=feedback_type,
+                        severity=BetaTestSeverity.LOW, title="t", description="d", status=status)
+
+
+def test_leaderboard_counts_feedback_per_user(manager, beta_users, test_db_session):
+    """Feedback counts come from one grouped query, including users with none"""
+    alice, _ = beta_users
+    test_db_session.add_all([_feedback(alice), _feedback(alice, FeedbackType.GENERAL_FEEDBACK)])
+    test_db_session.flush()
+
+    leaderboard = manager.get_user_leaderboard(limit=10)
+
+    assert [(row["name"], row["feedback_count"]) for row in leaderboard] == [("Alice", 2), ("Bob", 0)]
+
+
+def test_beta_metrics_aggregates(manager, beta_users, test_db_session):
+    """Active users, sessions and bug counts are aggregated per phase"""
+    alice, bob = beta_users
+    test_db_session.add_all([
+        _feedback(alice),
+        _feedback(alice, status="resolved"),
+        _feedback(alice, FeedbackType.FEATURE_REQUEST, status="resolved"),
+        _feedback(bob),
+        BetaTestSession(beta_user_id=alice.id, session_id="s1", duration=30.0),
+        BetaTestSession(beta_user_id=alice.id, session_id="s2"),
+        BetaTestSession(beta_user_id=bob.id, session_id="s3", duration=90.0),
+    ])
+    test_db_session.flush()
+
+    overall = manager.get_beta_metrics()
+    internal = manager.get_beta_metrics(BetaTestPhase.INTERNAL)
+
+    assert (overall.active_users, overall.total_sessions, overall.avg_session_duration) == (1, 3, 60.0)
+    assert (overall.bugs_reported, overall.bugs_resolved) == (3, 1)
+    assert (internal.total_sessions, internal.avg_session_duration) == (2, 30.0)
+    assert (internal.bugs_reported, internal.bugs_resolved) == (2, 1)
+
+
+def test_track_user_action_buffers_until_flush(manager):
+    """Counters update immediately while events reach the collector in a batch"""
+    manager.active_sessions["s1"] = {"beta_user_id": 1, "hits": 0, "last_activity": 0.0,
+                                     "actions": 0, "pages": 0, "errors": 0}
+
+    manager.track_user_action("s1", "page_visit", {"path": "/"})
+    manager.track_user_action("s1", "error", {})
+    manager.track_user_action("unknown", "page_visit", {})
+
+    session = manager.active_sessions["s1"]
+    assert (session["actions"], session["pages"], session["errors"], session["hits"]) == (2, 1, 1, 2)
+    assert manager.metrics_collector.get_events("beta_user_action") == []
+
+    assert manager.flush_actions() == 2
+    events = manager.metrics_collector.get_events("beta_user_action")
+    assert [event["action"] for event in events] == ["page_visit", "error"]
+
+
+def test_beta_metrics_cached_until_write(manager, beta_users, test_db_session):
+    """Repeated reads reuse the snapshot; submitting feedback invalidates it"""
+    alice, _ = beta_users
+    first = manager.get_beta_metrics()
+    test_db_session.add(_feedback(alice))
+    test_db_session.flush()
+
+    assert manager.get_beta_metrics() is first
+
+    manager.submit_feedback(alice.id, {"feedback_type": "bug_report", "severity": "low",
+                                       "title": "t", "description": "d"})
+
+    assert manager.get_beta_metrics().bugs_reported == first.bugs_reported + 2
+
+
+def test_session_shards_behave_like_a_dict():
+    """Sessions spread over shards but read back by id"""
+    shards = beta_testing.SessionShards(num_shards=4)
+    for i in range(10):
+        shards[f"s{i}"] = {"n": i}
+
+    assert len(shards) == 10
+    assert "s3" in shards and shards["s3"] == {"n": 3}
+    assert shards.pop("s3") == {"n": 3}
+    assert shards.pop("s3") is None and shards.get("s3") is None
+    assert len(shards) == 9
+
+
+def test_idle_sessions_evicted_least_used_first(manager, monkeypatch):
+    """At the limit the least-used session goes and survivors' hits are halved"""
+    monkeypatch.setattr(beta_testing, "MAX_ACTIVE_SESSIONS", 3)
+    for sid, hits, last_activity in [("busy", 4, 1.0), ("idle", 0, 2.0), ("older", 0, 1.0)]:
+        manager.active_sessions[sid] = {"hits": hits, "last_activity": last_activity}
+
+    manager._evict_idle_sessions()
+
+    assert "older" not in manager.active_sessions
+    assert manager.active_sessions["busy"]["hits"] == 2
+    assert len(manager.active_sessions) == 2
+
+
+def test_submit_feedback_bulk_returns_ids_in_order(manager, beta_users, test_db_session):
+    """One multi-row insert returns ids matching the input order"""
+    alice, _ = beta_users
+    items = [{"feedback_type": "bug_report", "severity": "critical", "title": f"t{i}", "description": "d"}
+             for i in range(3)]
+
+    ids = manager.submit_feedback_bulk(alice.id, items)
+
+    titles = {fb.id: fb.title for fb in test_db_session.query(BetaFeedback).filter(BetaFeedback.id.in_(ids))}
+    assert [titles[i] for i in ids] == ["t0", "t1", "t2"]
+    assert manager.submit_feedback_bulk(alice.id, []) == []
+
+
+def test_export_streams_tagged_ndjson_records(manager, beta_users, test_db_session):
+    """Each line is one JSON record; enums and datetimes are encoded as strings"""
+    alice, _ = beta_users
+    test_db_session.add(_feedback(alice))
+    test_db_session.flush()
+
+    lines = list(manager.export_beta_data())
+    records = [json.loads(line) for line in lines]
+
+    assert all(line.endswith(b"\n") for line in lines)
+    assert [r["record_type"] for r in records] == ["summary", "user", "user", "feedback"]
+    assert records[0]["total_users"] == 2
+    assert records[1]["phase"] in {"internal", "closed"}
+    assert records[3]["type"] == "bug_report" and records[3]["severity"] == "low"
+    assert isinstance(records[3]["created_at"], str)
+
+
+def test_session_rows_batched_and_user_totals_bumped(manager, beta_users, test_db_session):
+    """Queued sessions land in one flush that also bumps the user's totals"""
+    alice, _ = beta_users
+    with patch.object(manager, "_ensure_session_writer", return_value=True):
+        first = manager.start_beta_session(alice.id, {"browser": "firefox"})
+        manager.start_beta_session(alice.id, {})
+
+    assert test_db_session.query(BetaTestSession).count() == 0
+    assert manager.flush_sessions() == 2
+
+    test_db_session.expire_all()
+    assert test_db_session.query(BetaTestSession).count() == 2
+    assert alice.total_sessions == 7 and alice.last_login is not None
+
+    manager.end_beta_session(first)
+    ended = test_db_session.query(BetaTestSession).filter_by(session_id=first).one()
+    assert ended.browser == "firefox" and ended.duration is not None
+
+
+def test_session_ids_are_time_ordered_uuid7(monkeypatch):
+    """Later ids sort after earlier ones and carry the version 7 marker"""
+    monkeypatch.setattr(beta_testing.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    earlier = beta_testing._uuid7()
+    monkeypatch.setattr(beta_testing.time, "time_ns", lambda: 1_700_000_000_001_000_000)
+    later = beta_testing._uuid7()
+
+    assert (earlier.version, later.version) == (7, 7)
+    assert str(earlier) < str(later)
+
+
+def test_session_time_written_behind(manager, beta_users, test_db_session):
+    """Ended sessions add their duration to the user total on the next flush"""
+    alice, _ = beta_users
+    with patch.object(manager, "_ensure_user_time_writer", return_value=True):
+        session_id = manager.start_beta_session(alice.id, {})
+        manager.end_beta_session(session_id)
+
+    test_db_session.expire_all()
+    assert alice.total_session_time == 100.0
+    assert alice.id in manager._pending_user_time
+
+    assert manager.flush_user_time() == 1
+    test_db_session.expire_all()
+    assert alice.total_session_time >= 100.0
+    assert manager.flush_user_time() == 0
+
+
+def test_critical_feedback_alert_sent_in_background(manager, beta_users):
+    """Critical feedback is alerted on the executor, not inline"""
+    alice, _ = beta_users
+    with patch.object(beta_testing, "_alert_executor") as executor:
+        manager.submit_feedback(alice.id, {"feedback_type": "bug_report", "severity": "critical",
+                                           "title": "down", "description": "d"})
+        manager.submit_feedback(alice.id, {"feedback_type": "bug_report", "severity": "low",
+                                           "title": "minor", "description": "d"})
+
+    executor.submit.assert_called_once()
+    assert executor.submit.call_args.args[2]["title"] == "down"
+
+
+def test_feedback_row_accepts_values_and_members():
+    """Payload enums may be raw values or parsed members; unknown ones are rejected"""
+    row = BetaTestingManager._feedback_row(1, {"feedback_type": FeedbackType.BUG_REPORT, "severity": "high",
+                                               "title": "t", "description": "d"})
+
+    assert (row["feedback_type"], row["severity"]) == (FeedbackType.BUG_REPORT, BetaTestSeverity.HIGH)
+    with pytest.raises(ValueError):
+        BetaTestingManager._feedback_row(1, {"feedback_type": "rant", "severity": "high",
+                                             "title": "t", "description": "d"})
+
+
+def test_start_beta_sessions_bulk_writes_all_rows(manager, beta_users, test_db_session):
+    """A bulk start inserts every row and bumps each user's session count once per row"""
+    alice, bob = beta_users
+    session_ids = manager.start_beta_sessions_bulk([
+        {"beta_user_id": alice.id, "browser": "firefox"},
+        {"beta_user_id": bob.id},
+        {"beta_user_id": alice.id},
+    ])
+
+    test_db_session.expire_all()
+    stored = {s.session_id: s.beta_user_id for s in test_db_session.query(BetaTestSession)}
+    assert [stored[sid] for sid in session_ids] == [alice.id, bob.id, alice.id]
+    assert (alice.total_sessions, bob.total_sessions) == (7, 3)
+    assert all(sid in manager.active_sessions for sid in session_ids)
+
+
+def test_failed_session_batch_retried_row_by_row(manager, beta_users, test_db_session):
+    """A bad row is requeued and eventually dropped without losing the rest of its batch"""
+    alice, _ = beta_users
+    write_sessions = manager._write_sessions
+
+    def write_unless_bad(rows):
+        if any(row["beta_user_id"] == -1 for row in rows):
+            raise RuntimeError("foreign key violation")
+        write_sessions(rows)
+
+    with patch.object(manager, "_write_sessions", side_effect=write_unless_bad), \
+            patch.object(manager, "_ensure_session_writer", return_value=True):
+        good = manager.start_beta_session(alice.id, {})
+        manager.start_beta_session(-1, {})
+
+        assert manager.flush_sessions() == 1
+        assert len(manager._pending_sessions) == 1
+        for _ in range(beta_testing.SESSION_WRITE_ATTEMPTS - 1):
+            assert manager.flush_sessions() == 0
+
+    assert not manager._pending_sessions and not manager._session_write_failures
+    assert test_db_session.query(BetaTestSession).filter_by(session_id=good).count() == 1
+
+
+def test_flush_pending_writes_every_buffer(manager, beta_users, test_db_session):
+    """Shutdown flushing persists queued sessions and session time even if one flush fails"""
+    alice, _ = beta_users
+    with patch.object(manager, "_ensure_session_writer", return_value=True), \
+            patch.object(manager, "_ensure_user_time_writer", return_value=True):
+        session_id = manager.start_beta_session(alice.id, {})
+    manager._pending_user_time[alice.id] += 10.0
+
+    with patch.object(manager, "flush_actions", side_effect=RuntimeError("collector down")):
+        manager.flush_pending()
+
+    assert not manager._pending_sessions and not manager._pending_user_time
+    test_db_session.expire_all()
+    assert test_db_session.query(BetaTestSession).filter_by(session_id=session_id).count() == 1
+    assert alice.total_session_time == 110.0
+
+
+def test_end_session_with_unwritten_row_warns_and_credits_time(manager, beta_users, caplog):
+    """A session whose row failed to insert still adds its time, and the gap is logged"""
+    alice, _ = beta_users
+    with patch.object(manager, "_ensure_session_writer", return_value=True), \
+            patch.object(manager, "_ensure_user_time_writer", return_value=True), \
+            patch.object(manager, "_write_sessions", side_effect=RuntimeError("database unavailable")):
+        session_id = manager.start_beta_session(alice.id, {})
+        manager.end_beta_session(session_id)
+
+    assert f"Beta session {session_id} row not written yet" in caplog.text
+    assert alice.id in manager._pending_user_time
+    assert len(manager._pending_sessions) == 1
+
+
+def test_failed_session_time_write_keeps_reads_working(manager, beta_users):
+    """A failed write-behind flush keeps its deltas and the leaderboard is still served"""
+    alice, _ = beta_users
+    manager._pending_user_time[alice.id] += 5.0
+
+    with patch.object(beta_testing, "update", side_effect=RuntimeError("database locked")):
+        leaderboard = manager.get_user_leaderboard(limit=10)
+
+    assert [row["name"] for row in leaderboard] == ["Alice", "Bob"]
+    assert manager._pending_user_time[alice.id] == 5.0
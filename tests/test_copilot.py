@@ -1,6 +1,60 @@
+import asyncio
+
+import numpy as np
+
+from services.app import copilot
 from services.app.copilot import CopilotRetriever
 
 def test_copilot_query():
     cop = CopilotRetriever()
     res = cop.query("What is the purpose of Information Security Policy?", k=2)
-    assert len(res) >= 1
\ No newline at end of file
+    assert len(res) >= 1
+
+
+class _CountingModel:
+    """Deterministic stand-in encoder that records what it was asked to encode"""
+    calls = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, texts, **kwargs):
+        _CountingModel.calls.append(texts)
+        if isinstance(texts, list):
+            return np.array([[len(t), 1.0] for t in texts])
+        return np.array([len(texts), 1.0])
+
+
+def test_corpus_embeddings_cached_on_disk(tmp_path, monkeypatch):
+    """A second retriever re-encodes only paragraphs that changed"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    para_a, para_b = "a" * 60, "b" * 80
+    (docs / "guide.md").write_text(f"{para_a}\n\n{para_b}")
+    monkeypatch.setattr(copilot, "DOC_DIRS", [docs])
+    monkeypatch.setattr(copilot, "EMBEDDING_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(copilot, "EMBEDDINGS_AVAILABLE", True)
+    monkeypatch.setattr(copilot, "SentenceTransformer", _CountingModel)
+    _CountingModel.calls = []
+
+    CopilotRetriever()
+    (docs / "guide.md").write_text(f"{para_a}\n\n{'c' * 70}")
+    retriever = CopilotRetriever()
+
+    assert _CountingModel.calls == [[para_a, para_b], ["c" * 70]]
+    assert np.allclose(np.linalg.norm(retriever.embeddings, axis=1), 1.0, atol=1e-6)
+
+
+def test_iter_paragraphs_skips_short_blocks():
+    """Paragraphs are split on blank lines, stripped, and short ones dropped"""
+    text = f"# Title\n\n  {'x' * 60}  \n\n\n{'y' * 51}\n\nshort\n\n{'z' * 50}"
+
+    assert list(copilot._iter_paragraphs(text)) == ["x" * 60, "y" * 51]
+
+
+def test_query_async_matches_query():
+    """The async entry point returns the same answers as the blocking one"""
+    cop = CopilotRetriever()
+    question = "What is the purpose of Information Security Policy?"
+
+    assert asyncio.run(cop.query_async(question, k=2)) == cop.query(question, k=2)
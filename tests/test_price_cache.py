@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from services.app import price_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    price_cache.clear_price_cache()
+    yield
+    price_cache.clear_price_cache()
+
+
+def _frame(symbols):
+    index = pd.date_range("2024-01-01", periods=3, freq="D")
+    columns = pd.MultiIndex.from_product([symbols, ["Close"]])
+    return pd.DataFrame(1.0, index=index, columns=columns)
+
+
+def test_get_close_prices_batches_and_caches():
+    """Symbols are fetched in one batch and served from cache afterwards"""
+    with patch.object(price_cache.yf, "download", return_value=_frame(["AAPL", "SPY"])) as mock_download:
+        first = price_cache.get_close_prices(["AAPL", "SPY"], datetime(2024, 1, 1, 9), datetime(2024, 1, 3, 9))
+        second = price_cache.get_close_prices(["SPY"], datetime(2024, 1, 1, 17), datetime(2024, 1, 3, 17))
+
+    assert set(first) == {"AAPL", "SPY"}
+    assert second["SPY"] is first["SPY"]
+    mock_download.assert_called_once()
+
+
+def test_get_close_prices_single_symbol_layout():
+    """A single-ticker download without the ticker column level is handled"""
+    frame = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.date_range("2024-01-01", periods=2))
+    with patch.object(price_cache.yf, "download", return_value=frame):
+        result = price_cache.get_close_prices(["MSFT"], datetime(2024, 1, 1), datetime(2024, 1, 2))
+
+    assert list(result["MSFT"]) == [1.0, 2.0]
+
+
+def test_get_close_prices_falls_back_per_symbol():
+    """Symbols missing from the batch are fetched individually"""
+    history = pd.DataFrame(
+        {"Close": [5.0, 6.0]},
+        index=pd.date_range("2024-01-01", periods=2, tz="America/New_York"),
+    )
+    with patch.object(price_cache.yf, "download", side_effect=Exception("batch rejected")), \
+            patch.object(price_cache.yf, "Ticker") as mock_ticker:
+        mock_ticker.return_value.history.return_value = history
+        result = price_cache.get_close_prices(["AAPL", "MSFT"], datetime(2024, 1, 1), datetime(2024, 1, 2))
+
+    assert set(result) == {"AAPL", "MSFT"}
+    assert result["AAPL"].index.tz is None
+    assert mock_ticker.call_count == 2
+
+
+def test_batch_and_fallback_use_same_adjustment():
+    """Both fetch paths request the same price adjustment"""
+    history = pd.DataFrame({"Close": [5.0]}, index=pd.date_range("2024-01-01", periods=1))
+    with patch.object(price_cache.yf, "download", return_value=_frame(["AAPL"])) as mock_download, \
+            patch.object(price_cache.yf, "Ticker") as mock_ticker:
+        mock_ticker.return_value.history.return_value = history
+        price_cache.get_close_prices(["AAPL", "MSFT"], datetime(2024, 1, 1), datetime(2024, 1, 3))
+
+    assert mock_download.call_args.kwargs["auto_adjust"] is price_cache.AUTO_ADJUST is True
+    assert mock_ticker.return_value.history.call_args.kwargs["auto_adjust"] is True